@@ -1,18 +1,36 @@
 """Analysis API routes for running the agent pipeline."""
-from fastapi import APIRouter, Request, HTTPException, BackgroundTasks
-from pydantic import BaseModel
+from fastapi import APIRouter, Request, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, TypeAdapter
 from typing import Optional
 import logging
+import uuid
 from datetime import datetime, timezone
 
 from db.database import db
 from auth.auth import get_current_user
-from services.orchestrator import NicheDiscoveryOrchestrator
+from models.profile import ProfileCreate
+from models.report import NicheReport, PipelineEvent
+from services.orchestrator import get_orchestrator
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/analyze", tags=["analysis"])
 
-orchestrator = NicheDiscoveryOrchestrator()
+
+def _field_default(field):
+    """Default for a profile field missing from a stored document."""
+    if not field.is_required():
+        return field.get_default(call_default_factory=True)
+    return {str: "", int: 0}.get(field.annotation)
+
+
+# (name, default) for every profile input the agents read, derived from the
+# model so defaults can't drift from ProfileCreate
+PROFILE_FIELDS = tuple(
+    (name, _field_default(field)) for name, field in ProfileCreate.model_fields.items()
+)
+
+_report_adapter = TypeAdapter(NicheReport)
 
 
 class AnalyzeRequest(BaseModel):
@@ -27,68 +45,93 @@ class AnalyzeResponse(BaseModel):
     message: str
 
 
-@router.post("", response_model=AnalyzeResponse)
+async def _load_profile(user_id: str, profile_id: Optional[str]):
+    """Fetch the user's profile and flatten it into the agents' input dict."""
+    # Get profile
+    if profile_id:
+        profile_doc = await db.profiles.find_one({"id": profile_id, "user_id": user_id})
+    else:
+        profile_doc = await db.profiles.find_one({"user_id": user_id})
+    
+    if not profile_doc:
+        raise HTTPException(status_code=404, detail="Profile not found. Please complete onboarding first.")
+    
+    # Prepare profile data for agents
+    profile_data = {name: profile_doc.get(name, default) for name, default in PROFILE_FIELDS}
+    
+    return profile_doc, profile_data
+
+
+@router.post("", response_model=AnalyzeResponse, status_code=202)
 async def run_analysis(request: Request, body: AnalyzeRequest = None):
-    """Run the niche discovery analysis pipeline.
+    """Queue the niche discovery analysis pipeline.
     
     This endpoint:
     1. Fetches the user's profile
-    2. Runs all agents in sequence
-    3. Saves the report to the database
-    4. Returns the report ID
+    2. Saves a pending report to the database
+    3. Enqueues the agent pipeline on the worker
+    4. Returns the report ID (poll /reports/{id}/status for progress)
     """
     user = await get_current_user(request)
     body = body or AnalyzeRequest()
     
-    # Get profile
-    if body.profile_id:
-        profile_doc = await db.profiles.find_one({"id": body.profile_id, "user_id": user.id})
-    else:
-        profile_doc = await db.profiles.find_one({"user_id": user.id})
-    
-    if not profile_doc:
-        raise HTTPException(status_code=404, detail="Profile not found. Please complete onboarding first.")
+    profile_doc, profile_data = await _load_profile(user.id, body.profile_id)
     
-    # Prepare profile data for agents
-    profile_data = {
-        "education": profile_doc.get("education", ""),
-        "current_role": profile_doc.get("current_role", ""),
-        "years_experience": profile_doc.get("years_experience", 0),
-        "tech_skills": profile_doc.get("tech_skills", []),
-        "domain_skills": profile_doc.get("domain_skills", []),
-        "soft_skills": profile_doc.get("soft_skills", []),
-        "previous_projects": profile_doc.get("previous_projects", ""),
-        "excited_domains": profile_doc.get("excited_domains", []),
-        "hours_per_week": profile_doc.get("hours_per_week", 10),
-        "runway_months": profile_doc.get("runway_months"),
-        "location": profile_doc.get("location", ""),
-        "risk_appetite": profile_doc.get("risk_appetite", "medium"),
-        "target_roles": profile_doc.get("target_roles", []),
-        "existing_portfolio": profile_doc.get("existing_portfolio", ""),
-        "github_url": profile_doc.get("github_url", ""),
-        "network_strength": profile_doc.get("network_strength", "moderate"),
-        "learning_mode": profile_doc.get("learning_mode", "build-first")
-    }
+    report_id = str(uuid.uuid4())
+    await db.reports.insert_one({
+        "id": report_id,
+        "user_id": user.id,
+        "profile_id": profile_doc["id"],
+        "status": "pending",
+        "created_at": datetime.now(timezone.utc),
+        "milestones_completed": []
+    })
     
     try:
-        # Run the orchestrator
-        logger.info(f"Starting analysis for user {user.id}")
-        report = await orchestrator.run(profile_data, user.id, profile_doc["id"])
-        
-        # Save report to database
-        report_doc = report.model_dump()
-        report_doc["created_at"] = report_doc["created_at"].isoformat()
-        
-        await db.reports.insert_one(report_doc)
-        
-        logger.info(f"Analysis completed for user {user.id}, report {report.id}")
-        
-        return AnalyzeResponse(
-            report_id=report.id,
-            status="completed",
-            message="Analysis completed successfully"
+        await request.app.state.arq.enqueue_job(
+            "run_analysis_task", report_id, profile_data, user.id, profile_doc["id"]
         )
-        
     except Exception as e:
-        logger.error(f"Analysis failed for user {user.id}: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+        logger.error(f"Failed to queue analysis for user {user.id}: {str(e)}")
+        await db.reports.update_one(
+            {"id": report_id},
+            {"$set": {"status": "failed", "error": str(e)}}
+        )
+        raise HTTPException(status_code=503, detail="Analysis queue unavailable")
+    
+    logger.info(f"Queued analysis for user {user.id}, report {report_id}")
+    
+    return AnalyzeResponse(
+        report_id=report_id,
+        status="pending",
+        message="Analysis queued"
+    )
+
+
+@router.post("/stream")
+async def stream_analysis(request: Request, body: AnalyzeRequest = None):
+    """Run the analysis pipeline in-process and stream progress as SSE.
+    
+    Emits one event per agent as it finishes so the client can render
+    partial results, then saves the report and emits it as the last event.
+    """
+    user = await get_current_user(request)
+    body = body or AnalyzeRequest()
+    
+    profile_doc, profile_data = await _load_profile(user.id, body.profile_id)
+    report_id = str(uuid.uuid4())
+    
+    async def event_stream():
+        try:
+            # Built on first use; queued analyses run on the worker instead
+            async for event in get_orchestrator().run_streaming(profile_data, user.id, profile_doc["id"], report_id):
+                if event.event == "report_completed":
+                    await db.reports.insert_one(_report_adapter.dump_python(event.report))
+                    logger.info(f"Streamed analysis completed for user {user.id}, report {report_id}")
+                yield f"data: {event.model_dump_json()}\n\n"
+        except Exception as e:
+            logger.error(f"Streamed analysis failed for user {user.id}: {str(e)}")
+            error_event = PipelineEvent(event="failed", data={"error": str(e)})
+            yield f"data: {error_event.model_dump_json()}\n\n"
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
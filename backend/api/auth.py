@@ -1,17 +1,51 @@
 """Authentication API routes using Emergent Auth."""
 from fastapi import APIRouter, Request, Response, HTTPException
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 from datetime import datetime, timezone, timedelta
+from cachetools import TTLCache
 import httpx
 import logging
 
 from db.database import db
 from models.user import User, UserSession
-from auth.auth import get_current_user
+from auth.auth import get_current_user, invalidate_session
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+_user_adapter = TypeAdapter(User)
+_session_adapter = TypeAdapter(UserSession)
+
+# Pre-built Set-Cookie headers (same attributes set_cookie/delete_cookie would emit)
+SESSION_MAX_AGE = 7 * 24 * 60 * 60  # 7 days
+_SESSION_COOKIE = "session_token={}; HttpOnly; Max-Age=%d; Path=/; SameSite=none; Secure" % SESSION_MAX_AGE
+_LOGOUT_COOKIE = 'session_token=""; expires=Thu, 01 Jan 1970 00:00:00 GMT; HttpOnly; Max-Age=0; Path=/; SameSite=none; Secure'
+
+
+# Successful Emergent session-data lookups, so a retried exchange of the same
+# session_id doesn't hit the provider again. Failures are never cached.
+EMERGENT_SESSION_DATA_URL = "https://demobackend.emergentagent.com/auth/v1/env/oauth/session-data"
+_session_data_cache: TTLCache = TTLCache(maxsize=1_000, ttl=60)
+
+
+async def fetch_session_data(client: httpx.AsyncClient, session_id: str) -> dict:
+    """Exchange an Emergent Auth session_id for user data. Raises 401 if invalid."""
+    cached = _session_data_cache.get(session_id)
+    if cached is not None:
+        return cached
+    
+    auth_response = await client.get(
+        EMERGENT_SESSION_DATA_URL,
+        headers={"X-Session-ID": session_id}
+    )
+    
+    if auth_response.status_code != 200:
+        raise HTTPException(status_code=401, detail="Invalid session")
+    
+    auth_data = auth_response.json()
+    _session_data_cache[session_id] = auth_data
+    return auth_data
+
 
 class SessionRequest(BaseModel):
     """Request body for session processing."""
@@ -26,8 +60,11 @@ class UserResponse(BaseModel):
     picture: str | None = None
 
 
+_USER_RESPONSE_FIELDS = set(UserResponse.model_fields)
+
+
 @router.post("/session")
-async def process_session(request: SessionRequest, response: Response):
+async def process_session(request: SessionRequest, http_request: Request, response: Response):
     """Process session ID from Emergent Auth and create local session.
     
     This endpoint:
@@ -38,16 +75,7 @@ async def process_session(request: SessionRequest, response: Response):
     """
     try:
         # Exchange session_id for user data
-        async with httpx.AsyncClient() as client:
-            auth_response = await client.get(
-                "https://demobackend.emergentagent.com/auth/v1/env/oauth/session-data",
-                headers={"X-Session-ID": request.session_id}
-            )
-            
-            if auth_response.status_code != 200:
-                raise HTTPException(status_code=401, detail="Invalid session")
-            
-            auth_data = auth_response.json()
+        auth_data = await fetch_session_data(http_request.app.state.http, request.session_id)
         
         # Check if user exists
         existing_user = await db.users.find_one({"email": auth_data["email"]})
@@ -61,8 +89,7 @@ async def process_session(request: SessionRequest, response: Response):
                 name=auth_data["name"],
                 picture=auth_data.get("picture")
             )
-            user_doc = user.model_dump()
-            user_doc["created_at"] = user_doc["created_at"].isoformat()
+            user_doc = _user_adapter.dump_python(user)
             await db.users.insert_one(user_doc)
             user_id = user.id
         
@@ -70,23 +97,18 @@ async def process_session(request: SessionRequest, response: Response):
         session = UserSession(
             user_id=user_id,
             session_token=auth_data["session_token"],
-            expires_at=datetime.now(timezone.utc) + timedelta(days=7)
+            expires_at=datetime.now(timezone.utc) + timedelta(seconds=SESSION_MAX_AGE)
+        )
+        session_doc = _session_adapter.dump_python(session)
+        # Upsert so a retried exchange of the same session doesn't hit the unique index
+        await db.user_sessions.replace_one(
+            {"session_token": session_doc["session_token"]},
+            session_doc,
+            upsert=True
         )
-        session_doc = session.model_dump()
-        session_doc["created_at"] = session_doc["created_at"].isoformat()
-        session_doc["expires_at"] = session_doc["expires_at"].isoformat()
-        await db.user_sessions.insert_one(session_doc)
         
         # Set cookie
-        response.set_cookie(
-            key="session_token",
-            value=auth_data["session_token"],
-            httponly=True,
-            secure=True,
-            samesite="none",
-            path="/",
-            max_age=7 * 24 * 60 * 60  # 7 days
-        )
+        response.headers.append("set-cookie", _SESSION_COOKIE.format(auth_data["session_token"]))
         
         return {
             "id": user_id,
@@ -104,11 +126,11 @@ async def process_session(request: SessionRequest, response: Response):
 async def get_me(request: Request):
     """Get current authenticated user."""
     user = await get_current_user(request)
-    return UserResponse(
-        id=user.id,
-        email=user.email,
-        name=user.name,
-        picture=user.picture
+    # Serialize the UserResponse subset of User straight to JSON bytes in
+    # pydantic-core; response_model is kept for the OpenAPI schema
+    return Response(
+        content=_user_adapter.dump_json(user, include=_USER_RESPONSE_FIELDS),
+        media_type="application/json"
     )
 
 
@@ -120,13 +142,9 @@ async def logout(request: Request, response: Response):
     if session_token:
         # Delete session from database
         await db.user_sessions.delete_one({"session_token": session_token})
+        invalidate_session(session_token)
     
     # Clear cookie
-    response.delete_cookie(
-        key="session_token",
-        path="/",
-        secure=True,
-        samesite="none"
-    )
+    response.headers.append("set-cookie", _LOGOUT_COOKIE)
     
     return {"message": "Logged out successfully"}
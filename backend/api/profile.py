@@ -1,56 +1,64 @@
 """Profile API routes."""
 from fastapi import APIRouter, Request, HTTPException
+from pydantic import TypeAdapter
+from pymongo import ReturnDocument
 from datetime import datetime, timezone
 import logging
+import uuid
 
 from db.database import db
-from models.profile import FounderProfile, ProfileCreate
+from models.profile import FounderProfile, ProfileCreate, ProfileUpdate
 from auth.auth import get_current_user
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/profile", tags=["profile"])
 
+_profile_adapter = TypeAdapter(FounderProfile)
+
 
 @router.post("", response_model=FounderProfile)
 async def create_or_update_profile(profile_data: ProfileCreate, request: Request):
     """Create or update the founder profile for the current user."""
     user = await get_current_user(request)
     
-    # Check if profile exists
-    existing = await db.profiles.find_one({"user_id": user.id})
+    now = datetime.now(timezone.utc)
+    set_doc = profile_data.model_dump()
+    set_doc["updated_at"] = now
+    
+    # Single atomic upsert: fields in $setOnInsert are only written on create
+    profile_doc = await db.profiles.find_one_and_update(
+        {"user_id": user.id},
+        {
+            "$set": set_doc,
+            "$setOnInsert": {"id": str(uuid.uuid4()), "user_id": user.id, "created_at": now}
+        },
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+        projection={"_id": 0}
+    )
+    
+    return _profile_adapter.validate_python(profile_doc)
+
+
+@router.patch("", response_model=FounderProfile)
+async def patch_profile(body: ProfileUpdate, request: Request):
+    """Update only the profile fields present in the request body."""
+    user = await get_current_user(request)
+    
+    diff = body.model_dump(exclude_unset=True)
+    diff["updated_at"] = datetime.now(timezone.utc)
     
-    if existing:
-        # Update existing profile
-        profile = FounderProfile(
-            id=existing["id"],
-            user_id=user.id,
-            created_at=datetime.fromisoformat(existing["created_at"]) if isinstance(existing["created_at"], str) else existing["created_at"],
-            updated_at=datetime.now(timezone.utc),
-            **profile_data.model_dump()
-        )
-        
-        profile_doc = profile.model_dump()
-        profile_doc["created_at"] = profile_doc["created_at"].isoformat()
-        profile_doc["updated_at"] = profile_doc["updated_at"].isoformat()
-        
-        await db.profiles.update_one(
-            {"id": existing["id"]},
-            {"$set": profile_doc}
-        )
-    else:
-        # Create new profile
-        profile = FounderProfile(
-            user_id=user.id,
-            **profile_data.model_dump()
-        )
-        
-        profile_doc = profile.model_dump()
-        profile_doc["created_at"] = profile_doc["created_at"].isoformat()
-        profile_doc["updated_at"] = profile_doc["updated_at"].isoformat()
-        
-        await db.profiles.insert_one(profile_doc)
+    profile_doc = await db.profiles.find_one_and_update(
+        {"user_id": user.id},
+        {"$set": diff},
+        return_document=ReturnDocument.AFTER,
+        projection={"_id": 0}
+    )
     
-    return profile
+    if not profile_doc:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    
+    return _profile_adapter.validate_python(profile_doc)
 
 
 @router.get("", response_model=FounderProfile | None)
@@ -63,10 +71,4 @@ async def get_profile(request: Request):
     if not profile_doc:
         return None
     
-    # Convert datetime strings
-    if isinstance(profile_doc.get('created_at'), str):
-        profile_doc['created_at'] = datetime.fromisoformat(profile_doc['created_at'])
-    if isinstance(profile_doc.get('updated_at'), str):
-        profile_doc['updated_at'] = datetime.fromisoformat(profile_doc['updated_at'])
-    
-    return FounderProfile(**profile_doc)
+    return _profile_adapter.validate_python(profile_doc)
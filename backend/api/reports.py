@@ -1,8 +1,11 @@
 """Reports API routes."""
-from fastapi import APIRouter, Request, HTTPException
+from fastapi import APIRouter, Request, Response, HTTPException
+from pydantic import BaseModel, TypeAdapter
+from pymongo import ReturnDocument
 from typing import List
-from datetime import datetime
+import hashlib
 import logging
+import orjson
 
 from db.database import db
 from models.report import NicheReport, ReportSummary
@@ -11,40 +14,72 @@ from auth.auth import get_current_user
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/reports", tags=["reports"])
 
+_summaries_adapter = TypeAdapter(List[ReportSummary])
+
+
+class MilestonesUpdate(BaseModel):
+    """Request body for updating milestone completion."""
+    milestones_completed: List[str] = []
+
+
+def _etag(*parts) -> str:
+    """Build a strong ETag from the parts of a response that can change."""
+    return '"%s"' % hashlib.blake2b(orjson.dumps(parts), digest_size=16).hexdigest()
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    """Check whether the client's If-None-Match already covers this ETag."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
 
 @router.get("", response_model=List[ReportSummary])
 async def list_reports(request: Request):
-    """List all reports for the current user."""
+    """List the current user's finished reports. Supports If-None-Match.
+    
+    Queued, running and failed analyses have no niches to summarize yet,
+    so only completed reports (and legacy ones without a status) are listed.
+    """
     user = await get_current_user(request)
     
-    reports = await db.reports.find(
-        {"user_id": user.id},
-        {"_id": 0, "id": 1, "recommended_niches": 1, "created_at": 1, "status": 1}
-    ).sort("created_at", -1).to_list(100)
-    
-    summaries = []
-    for r in reports:
-        niches = r.get("recommended_niches", [])
-        top_niche = niches[0] if niches else {}
-        
-        created_at = r.get("created_at")
-        if isinstance(created_at, str):
-            created_at = datetime.fromisoformat(created_at)
-        
-        summaries.append(ReportSummary(
-            id=r["id"],
-            top_niche=top_niche.get("name", "Unknown"),
-            fit_score=top_niche.get("fit_score", 0),
-            created_at=created_at,
-            status=r.get("status", "completed")
-        ))
-    
-    return summaries
+    # Project only the top niche's name and score server-side
+    reports = await db.reports.aggregate([
+        {"$match": {"user_id": user.id, "status": {"$in": ["completed", None]}}},
+        {"$sort": {"created_at": -1}},
+        {"$limit": 100},
+        {"$project": {
+            "_id": 0,
+            "id": 1,
+            "created_at": 1,
+            "status": {"$ifNull": ["$status", "completed"]},
+            "top_niche": {"$ifNull": [{"$arrayElemAt": ["$recommended_niches.name", 0]}, "Unknown"]},
+            "fit_score": {"$ifNull": [{"$arrayElemAt": ["$recommended_niches.fit_score", 0]}, 0]}
+        }}
+    ]).to_list(100)
+    
+    etag = _etag(reports)
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    # Serialize straight to JSON bytes in pydantic-core, skipping FastAPI's
+    # second response_model validation + jsonable_encoder pass
+    summaries = _summaries_adapter.validate_python(reports)
+    return Response(
+        content=_summaries_adapter.dump_json(summaries),
+        media_type="application/json",
+        headers={"ETag": etag}
+    )
 
 
 @router.get("/{report_id}")
-async def get_report(report_id: str, request: Request):
-    """Get a specific report by ID."""
+async def get_report(report_id: str, request: Request, response: Response):
+    """Get a specific report by ID. Supports If-None-Match.
+    
+    Generated reports only change through their status and milestones,
+    so those make up the ETag.
+    """
     user = await get_current_user(request)
     
     report_doc = await db.reports.find_one(
@@ -55,9 +90,26 @@ async def get_report(report_id: str, request: Request):
     if not report_doc:
         raise HTTPException(status_code=404, detail="Report not found")
     
-    # Convert datetime
-    if isinstance(report_doc.get('created_at'), str):
-        report_doc['created_at'] = datetime.fromisoformat(report_doc['created_at'])
+    etag = _etag(report_id, report_doc.get("status"), report_doc.get("milestones_completed", []))
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    
+    return report_doc
+
+
+@router.get("/{report_id}/status")
+async def get_report_status(report_id: str, request: Request):
+    """Get the processing status of a report, for polling queued analyses."""
+    user = await get_current_user(request)
+    
+    report_doc = await db.reports.find_one(
+        {"id": report_id, "user_id": user.id},
+        {"_id": 0, "id": 1, "status": 1, "error": 1}
+    )
+    
+    if not report_doc:
+        raise HTTPException(status_code=404, detail="Report not found")
     
     return report_doc
 
@@ -75,20 +127,38 @@ async def delete_report(report_id: str, request: Request):
     return {"message": "Report deleted successfully"}
 
 
-@router.patch("/{report_id}/milestones")
-async def update_milestones(report_id: str, request: Request):
-    """Update milestone completion status."""
+@router.get("/{report_id}/milestones")
+async def get_milestones(report_id: str, request: Request):
+    """Get only the milestone completion status of a report."""
     user = await get_current_user(request)
-    body = await request.json()
     
-    milestones = body.get("milestones_completed", [])
+    milestones_doc = await db.reports.find_one(
+        {"id": report_id, "user_id": user.id},
+        {"_id": 0, "milestones_completed": 1}
+    )
+    
+    if milestones_doc is None:
+        raise HTTPException(status_code=404, detail="Report not found")
+    
+    return {"milestones_completed": milestones_doc.get("milestones_completed", [])}
+
+
+@router.patch("/{report_id}/milestones")
+async def update_milestones(report_id: str, body: MilestonesUpdate, request: Request):
+    """Update milestone completion status and return the stored list."""
+    user = await get_current_user(request)
     
-    result = await db.reports.update_one(
+    milestones_doc = await db.reports.find_one_and_update(
         {"id": report_id, "user_id": user.id},
-        {"$set": {"milestones_completed": milestones}}
+        {"$set": {"milestones_completed": body.milestones_completed}},
+        projection={"_id": 0, "milestones_completed": 1},
+        return_document=ReturnDocument.AFTER
     )
     
-    if result.matched_count == 0:
+    if milestones_doc is None:
         raise HTTPException(status_code=404, detail="Report not found")
     
-    return {"message": "Milestones updated successfully"}
+    return {
+        "message": "Milestones updated successfully",
+        "milestones_completed": milestones_doc["milestones_completed"]
+    }
@@ -1,4 +1,4 @@
 """Auth package."""
-from .auth import get_current_user, get_optional_user
+from .auth import get_current_user, get_optional_user, invalidate_session
 
-__all__ = ['get_current_user', 'get_optional_user']
+__all__ = ['get_current_user', 'get_optional_user', 'invalidate_session']
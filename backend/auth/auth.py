@@ -2,9 +2,15 @@
 from fastapi import Request, HTTPException
 from typing import Optional
 from datetime import datetime, timezone
+from cachetools import TTLCache
 from db.database import db
 from models.user import User
 
+# Short-lived session_token -> User cache so repeat requests skip MongoDB.
+# Per-process: logout only evicts the entry in the worker that served it,
+# so keep the TTL short.
+_session_cache: TTLCache = TTLCache(maxsize=10_000, ttl=30)
+
 
 async def get_session_token(request: Request) -> Optional[str]:
     """Extract session token from cookies or Authorization header."""
@@ -28,29 +34,38 @@ async def get_current_user(request: Request) -> User:
     if not session_token:
         raise HTTPException(status_code=401, detail="Not authenticated")
     
-    # Find session
-    session = await db.user_sessions.find_one({"session_token": session_token})
-    if not session:
-        raise HTTPException(status_code=401, detail="Invalid session")
-    
-    # Check expiry
-    expires_at = session.get("expires_at")
-    if isinstance(expires_at, str):
-        expires_at = datetime.fromisoformat(expires_at.replace('Z', '+00:00'))
-    
-    if expires_at < datetime.now(timezone.utc):
-        raise HTTPException(status_code=401, detail="Session expired")
+    cached_user = _session_cache.get(session_token)
+    if cached_user is not None:
+        return cached_user
     
-    # Find user
-    user_doc = await db.users.find_one({"id": session["user_id"]})
-    if not user_doc:
-        raise HTTPException(status_code=401, detail="User not found")
+    # Join the unexpired session to its user in a single round-trip
+    docs = await db.user_sessions.aggregate([
+        {"$match": {
+            "session_token": session_token,
+            "expires_at": {"$gt": datetime.now(timezone.utc)}
+        }},
+        {"$limit": 1},
+        {"$lookup": {
+            "from": "users",
+            "localField": "user_id",
+            "foreignField": "id",
+            "as": "user"
+        }},
+        {"$unwind": "$user"},
+        {"$project": {"_id": 0, "user": 1}}
+    ]).to_list(1)
+    if not docs:
+        raise HTTPException(status_code=401, detail="Invalid or expired session")
     
-    # Convert datetime if needed
-    if isinstance(user_doc.get('created_at'), str):
-        user_doc['created_at'] = datetime.fromisoformat(user_doc['created_at'].replace('Z', '+00:00'))
-    
-    return User(**{k: v for k, v in user_doc.items() if k != '_id'})
+    user_doc = docs[0]["user"]
+    user = User(**{k: v for k, v in user_doc.items() if k != '_id'})
+    _session_cache[session_token] = user
+    return user
+
+
+def invalidate_session(session_token: str) -> None:
+    """Drop a session from the local cache (e.g. on logout)."""
+    _session_cache.pop(session_token, None)
 
 
 async def get_optional_user(request: Request) -> Optional[User]:
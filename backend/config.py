@@ -9,6 +9,20 @@ load_dotenv(ROOT_DIR / '.env')
 # Database
 MONGO_URL = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
 DB_NAME = os.environ.get('DB_NAME', 'founder_niche_db')
+MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', '200'))
+MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', '20'))
+MONGO_TIMEOUT_MS = int(os.environ.get('MONGO_TIMEOUT_MS', '3000'))
+# Wire compression; the server uses the first one it also supports
+MONGO_COMPRESSORS = os.environ.get('MONGO_COMPRESSORS', 'zstd,zlib')
+
+# Task queue (Arq on Redis)
+REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379')
+
+# Observability: also record prompt/response sizes in agent traces
+TRACE_LEN = os.environ.get('TRACE_LEN', '').lower() in ('1', 'true', 'yes')
+# Fraction of pipeline DEBUG/INFO log records kept (WARNING and up are always kept)
+LOG_SAMPLE_DEBUG = float(os.environ.get('LOG_SAMPLE_DEBUG', '0.01'))
+LOG_SAMPLE_INFO = float(os.environ.get('LOG_SAMPLE_INFO', '1.0'))
 
 # CORS
 CORS_ORIGINS = os.environ.get('CORS_ORIGINS', '*').split(',')
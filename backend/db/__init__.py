@@ -1,4 +1,4 @@
 """Database package."""
-from .database import get_database, db
+from .database import get_database, db, init_indexes
 
-__all__ = ['get_database', 'db']
+__all__ = ['get_database', 'db', 'init_indexes']
@@ -1,9 +1,25 @@
 """MongoDB database connection and utilities."""
+import logging
+
 from motor.motor_asyncio import AsyncIOMotorClient
-from config import MONGO_URL, DB_NAME
+from pymongo.errors import OperationFailure
+from config import (
+    MONGO_URL, DB_NAME, MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE,
+    MONGO_TIMEOUT_MS, MONGO_COMPRESSORS
+)
+
+logger = logging.getLogger(__name__)
 
-# MongoDB client
-client = AsyncIOMotorClient(MONGO_URL)
+# MongoDB client (tz_aware so BSON dates come back as UTC-aware datetimes)
+client = AsyncIOMotorClient(
+    MONGO_URL,
+    tz_aware=True,
+    maxPoolSize=MONGO_MAX_POOL_SIZE,
+    minPoolSize=MONGO_MIN_POOL_SIZE,
+    serverSelectionTimeoutMS=MONGO_TIMEOUT_MS,
+    connectTimeoutMS=MONGO_TIMEOUT_MS,
+    compressors=MONGO_COMPRESSORS
+)
 db = client[DB_NAME]
 
 
@@ -12,6 +28,32 @@ def get_database():
     return db
 
 
+async def _create_index(collection, keys, **kwargs) -> None:
+    """Create one index, logging rather than raising if it can't be built.
+    
+    Data written before an index existed may violate it (e.g. duplicate
+    sessions from retried logins); that must not keep the server from
+    starting. Remove the duplicates and restart to build the index.
+    """
+    try:
+        await collection.create_index(keys, **kwargs)
+    except OperationFailure as e:
+        logger.error(f"Could not create index {keys!r} on {collection.name}: {e}")
+
+
+async def init_indexes():
+    """Create indexes for the hot query paths. Safe to call on every startup."""
+    await _create_index(db.users, "email", unique=True)
+    await _create_index(db.users, "id", unique=True)
+    await _create_index(db.user_sessions, "session_token", unique=True)
+    # TTL index: MongoDB purges sessions once expires_at has passed
+    await _create_index(db.user_sessions, "expires_at", expireAfterSeconds=0)
+    # One profile per user; also makes the profile upsert race-free
+    await _create_index(db.profiles, "user_id", unique=True)
+    await _create_index(db.reports, [("user_id", 1), ("created_at", -1)])
+    await _create_index(db.reports, [("id", 1), ("user_id", 1)])
+
+
 async def close_database():
     """Close database connection."""
     client.close()
@@ -1,10 +1,10 @@
 """Models package for the Founder Niche Discovery Platform."""
 from .user import User, UserSession
-from .profile import FounderProfile, ProfileCreate
-from .report import NicheReport, ReportSummary, Niche, Roadmap, ToolRecommendation
+from .profile import FounderProfile, ProfileCreate, ProfileUpdate
+from .report import NicheReport, ReportSummary, Niche, Roadmap, ToolRecommendation, PipelineEvent, PartialReport
 
 __all__ = [
     'User', 'UserSession',
-    'FounderProfile', 'ProfileCreate',
-    'NicheReport', 'ReportSummary', 'Niche', 'Roadmap', 'ToolRecommendation'
+    'FounderProfile', 'ProfileCreate', 'ProfileUpdate',
+    'NicheReport', 'ReportSummary', 'Niche', 'Roadmap', 'ToolRecommendation', 'PipelineEvent', 'PartialReport'
 ]
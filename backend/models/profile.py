@@ -1,5 +1,5 @@
 """Founder profile models."""
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typing import List, Optional
 from datetime import datetime, timezone
 import uuid
@@ -39,6 +39,45 @@ class ProfileCreate(BaseModel):
     learning_mode: str  # build-first, theory-first, mentor-led, self-paced
 
 
+# ProfileCreate fields that default to None, i.e. the ones a profile can leave unset
+_NULLABLE_FIELDS = frozenset(
+    name for name, field in ProfileCreate.model_fields.items()
+    if not field.is_required() and field.default is None
+)
+
+
+class ProfileUpdate(BaseModel):
+    """Partial update of a founder profile; only fields sent are changed."""
+    education: Optional[str] = None
+    current_role: Optional[str] = None
+    years_experience: Optional[int] = None
+    tech_skills: Optional[List[str]] = None
+    domain_skills: Optional[List[str]] = None
+    soft_skills: Optional[List[str]] = None
+    previous_projects: Optional[str] = None
+    excited_domains: Optional[List[str]] = None
+    hours_per_week: Optional[int] = None
+    runway_months: Optional[int] = None
+    location: Optional[str] = None
+    risk_appetite: Optional[str] = None
+    target_roles: Optional[List[str]] = None
+    existing_portfolio: Optional[str] = None
+    github_url: Optional[str] = None
+    network_strength: Optional[str] = None
+    learning_mode: Optional[str] = None
+    
+    @model_validator(mode="after")
+    def _reject_null_required(self):
+        """Only fields that are optional on ProfileCreate may be cleared with null."""
+        nulls = sorted(
+            name for name in self.model_fields_set
+            if getattr(self, name) is None and name not in _NULLABLE_FIELDS
+        )
+        if nulls:
+            raise ValueError(f"{', '.join(nulls)} cannot be null")
+        return self
+
+
 class FounderProfile(ProfileCreate):
     """Full founder profile with metadata."""
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -83,3 +83,22 @@ class ReportSummary(BaseModel):
     fit_score: int
     created_at: datetime
     status: str
+
+
+class PartialReport(BaseModel):
+    """The report as far as the pipeline has got, streamed after each step."""
+    id: str
+    profile_summary: Optional[ProfileSummary] = None
+    recommended_niches: List[Niche] = []
+    roadmap: Optional[Roadmap] = None
+    tool_recommendations: List[ToolRecommendation] = []
+    status: str = "processing"
+
+
+class PipelineEvent(BaseModel):
+    """Progress event emitted while the agent pipeline runs."""
+    event: str  # agent_progress, agent_completed, agent_failed, report_completed
+    agent: Optional[str] = None
+    data: Dict[str, Any] = {}
+    partial: Optional[PartialReport] = None  # set on agent_completed
+    report: Optional[NicheReport] = None  # set on report_completed
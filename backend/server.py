@@ -3,9 +3,14 @@
 This platform helps aspiring founders discover their best startup niche
 through an agentic AI system that analyzes profiles and generates roadmaps.
 """
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, APIRouter
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
+from arq import create_pool
+from arq.connections import RedisSettings
+import httpx
 
 import logging
 from pathlib import Path
@@ -14,15 +19,19 @@ from pathlib import Path
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-from config import CORS_ORIGINS
-from db.database import db, close_database
+from config import CORS_ORIGINS, REDIS_URL
+from db.database import db, init_indexes, close_database
 from api import auth_router, profile_router, analysis_router, reports_router
+from services.llm_fallback import warmup as warmup_llm, close_http_client as close_llm_client
+from services.job_serializer import serialize_job, deserialize_job
+from services.orchestrator import start_pipeline_logging, stop_pipeline_logging
 
 # Create the main app
 app = FastAPI(
     title="Founder Niche Discovery Platform",
     description="AI-powered platform to help founders discover their ideal startup niche",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Create a router with the /api prefix
@@ -72,9 +81,28 @@ logger = logging.getLogger(__name__)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Starting Founder Niche Discovery Platform")
+    start_pipeline_logging()
+    await init_indexes()
+    app.state.arq = await create_pool(
+        RedisSettings.from_dsn(REDIS_URL),
+        job_serializer=serialize_job,
+        job_deserializer=deserialize_job
+    )
+    # Shared HTTP client so outbound calls reuse pooled keep-alive connections
+    app.state.http = httpx.AsyncClient(
+        http2=True,
+        timeout=10.0,
+        limits=httpx.Limits(max_keepalive_connections=20)
+    )
+    # Import litellm in the background so startup (and health checks) don't wait on it
+    app.state.llm_warmup = asyncio.create_task(asyncio.to_thread(warmup_llm))
     yield
     logger.info("Shutting down Founder Niche Discovery Platform")
+    await app.state.http.aclose()
+    await close_llm_client()
+    await app.state.arq.close()
     await close_database()
+    stop_pipeline_logging()
 
 app.router.lifespan_context = lifespan
 
@@ -1,5 +1,5 @@
 """Agents package for the agentic AI system."""
-from .base_agent import BaseAgent, AgentContext
+from .base_agent import BaseAgent, AgentContext, Trace
 from .profile_agent import ProfileAnalystAgent
 from .market_agent import MarketHunterAgent
 from .fit_agent import FitEvaluatorAgent
@@ -7,7 +7,7 @@ from .roadmap_agent import RoadmapArchitectAgent
 from .tooling_agent import ToolingAdvisorAgent
 
 __all__ = [
-    'BaseAgent', 'AgentContext',
+    'BaseAgent', 'AgentContext', 'Trace',
     'ProfileAnalystAgent', 'MarketHunterAgent', 'FitEvaluatorAgent',
     'RoadmapArchitectAgent', 'ToolingAdvisorAgent'
 ]
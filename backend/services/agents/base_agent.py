@@ -8,12 +8,22 @@ Observability: Each agent logs its inputs, outputs, and timing for future
 Datadog/LangSmith integration. The structured logging format is designed
 to be easily parsed by observability tools.
 """
-import json
+import asyncio
+import functools
+import hashlib
 import logging
+import re
+import time
+import weakref
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Type
 from datetime import datetime, timezone
-from pydantic import BaseModel, Field
+import orjson
+from cachetools import TTLCache
+from langgraph.config import get_stream_writer
+from pydantic import BaseModel, ValidationError
 from ..llm_fallback import LlmChat
 
 
@@ -22,38 +32,150 @@ from ..llm_fallback import LlmChat
 class UserMessage:
     def __init__(self, text: str):
         self.text = text
-from config import get_llm_api_key
+from config import get_llm_api_key, TRACE_LEN
 
 logger = logging.getLogger(__name__)
 
+# Traces kept per context; older ones are logged and dropped
+MAX_TRACES = 256
 
-class AgentContext(BaseModel):
+# Markdown code fences some providers wrap their JSON in
+_FENCE_JSON = b"```json"
+_FENCE = b"```"
+# Fallback for responses with prose around the JSON object
+_JSON_RE = re.compile(rb'\{[\s\S]*\}')
+
+# Agent outputs keyed by (agent, hash of the inputs the agent reads).
+# Values are serialized so a hit can't share lists the pipeline mutates.
+_output_cache: TTLCache = TTLCache(maxsize=1024, ttl=24 * 60 * 60)
+# One lock per in-flight cache key; entries go away once no run holds them
+_cache_locks: "weakref.WeakValueDictionary[Tuple[str, str], asyncio.Lock]" = weakref.WeakValueDictionary()
+
+
+def _strip_titles(node: Any) -> Any:
+    """Drop the auto-generated "title" keys, which only cost prompt tokens."""
+    if isinstance(node, dict):
+        return {
+            key: ({name: _strip_titles(v) for name, v in value.items()} if key == "properties" else _strip_titles(value))
+            for key, value in node.items() if key != "title"
+        }
+    if isinstance(node, list):
+        return [_strip_titles(v) for v in node]
+    return node
+
+
+@functools.lru_cache(maxsize=None)
+def output_schema(model: Type[BaseModel]) -> str:
+    """Compact JSON schema of an agent's output model, for its system prompt."""
+    return orjson.dumps(_strip_titles(model.model_json_schema())).decode()
+
+
+@functools.lru_cache(maxsize=None)
+def get_llm(agent_name: str, system_prompt: str) -> LlmChat:
+    """Return the shared LLM client for an agent.
+    
+    LlmChat holds no per-conversation state (each stream_message passes its
+    messages explicitly), so one client per (agent, system prompt) can be
+    reused by every agent instance and request.
+    """
+    return LlmChat(
+        api_key=get_llm_api_key(),
+        session_id=agent_name,
+        system_message=system_prompt
+    ).with_model("gemini", "gemini-2.0-flash")
+
+
+class Trace(NamedTuple):
+    """Timing metrics for one agent run.
+    
+    Kept as raw integers (epoch start and monotonic duration, in ns) and
+    only turned into ISO timestamps when the trace is serialized.
+    """
+    agent: str
+    status: str
+    start_ns: int
+    dur_ns: int = 0
+    llm_calls: int = 0
+    # Only recorded when TRACE_LEN is enabled
+    prompt_len: Optional[int] = None
+    resp_len: Optional[int] = None
+    err: Optional[str] = None
+    
+    @property
+    def start_time_iso(self) -> str:
+        return datetime.fromtimestamp(self.start_ns / 1e9, timezone.utc).isoformat()
+    
+    @property
+    def end_time_iso(self) -> str:
+        return datetime.fromtimestamp((self.start_ns + self.dur_ns) / 1e9, timezone.utc).isoformat()
+    
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "agent": self.agent,
+            "status": self.status,
+            "start_time": self.start_time_iso,
+            "end_time": self.end_time_iso,
+            "duration_ms": self.dur_ns / 1e6,
+            "llm_calls": self.llm_calls,
+            "prompt_length": self.prompt_len,
+            "response_length": self.resp_len,
+            "error": self.err
+        }
+
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, Trace):
+        return obj.as_dict()
+    if isinstance(obj, deque):
+        return list(obj)
+    raise TypeError
+
+
+@dataclass(slots=True)
+class AgentContext:
     """Shared context/state object that flows through all agents.
     
     This context accumulates results from each agent and is passed
-    to subsequent agents in the pipeline.
+    to subsequent agents in the pipeline. It is a plain dataclass rather
+    than a Pydantic model: it is built from already-validated profile data
+    and mutated by every agent, so per-assignment validation is pure overhead.
     """
     # Raw user inputs (from profile)
-    raw_profile: Dict[str, Any] = {}
+    raw_profile: Dict[str, Any] = field(default_factory=dict)
     
     # Profile Analyst output
     profile_summary: Optional[Dict[str, Any]] = None
     
     # Market Hunter output
-    candidate_niches: list = Field(default_factory=list)
+    candidate_niches: list = field(default_factory=list)
     
     # Fit Evaluator output
-    niche_evaluations: list = Field(default_factory=list)
-    selected_niches: list = Field(default_factory=list)
+    niche_evaluations: list = field(default_factory=list)
+    selected_niches: list = field(default_factory=list)
     
     # Roadmap Architect output
     roadmap: Optional[Dict[str, Any]] = None
     
     # Tooling Advisor output
-    tool_recommendations: list = Field(default_factory=list)
+    tool_recommendations: list = field(default_factory=list)
     
     # Metadata for observability
-    agent_traces: list = Field(default_factory=list)
+    agent_traces: deque = field(default_factory=lambda: deque(maxlen=MAX_TRACES))
+    
+    def to_json(self) -> bytes:
+        """Serialize the context for API responses."""
+        return orjson.dumps(self, default=_json_default)
+    
+    def traces_json(self) -> bytes:
+        """Serialize the agent traces in one pass."""
+        return orjson.dumps(self.agent_traces, default=_json_default)
+    
+    def add_trace(self, trace: Trace) -> None:
+        """Record a trace, logging the oldest one if the buffer is full."""
+        if len(self.agent_traces) == self.agent_traces.maxlen:
+            evicted = self.agent_traces.popleft()
+            logger.info(f"[trace] {orjson.dumps(evicted, default=_json_default).decode()}")
+        self.agent_traces.append(trace)
 
 
 class BaseAgent(ABC):
@@ -71,24 +193,35 @@ class BaseAgent(ABC):
     2. Implement the run() method
     3. Define your prompt in get_system_prompt() and get_user_prompt()
     4. Parse the response in parse_response()
+    
+    Agents that can split their work into independent LLM calls override
+    get_user_prompts() and parse_responses(); the calls then run
+    concurrently, at most max_concurrency at a time within one run.
     """
     
     name: str = "base_agent"
     description: str = "Base agent"
+    max_concurrency: int = 6
+    # Schema the LLM is asked to answer in (structured output)
+    output_model: Optional[Type[BaseModel]] = None
+    # Context fields this agent writes (restored on a cache hit)
+    output_fields: Tuple[str, ...] = ()
     
     def __init__(self):
-        self.api_key = get_llm_api_key()
-        self.llm = LlmChat(
-            api_key=self.api_key,
-            session_id=f"{self.name}_{datetime.now(timezone.utc).isoformat()}",
-            system_message=self.get_system_prompt()
-        ).with_model("gemini", "gemini-2.0-flash")
+        self.llm = get_llm(self.name, self.build_system_prompt())
     
     @abstractmethod
     def get_system_prompt(self) -> str:
         """Return the system prompt for this agent."""
         pass
     
+    def build_system_prompt(self) -> str:
+        """The system prompt plus the output schema the agent answers in."""
+        prompt = self.get_system_prompt()
+        if self.output_model is not None:
+            prompt += f"\n\n## Output Format (JSON Schema):\n{output_schema(self.output_model)}"
+        return prompt
+    
     @abstractmethod
     def get_user_prompt(self, context: AgentContext) -> str:
         """Return the user prompt based on context."""
@@ -99,72 +232,188 @@ class BaseAgent(ABC):
         """Parse the LLM response and update context."""
         pass
     
+    def get_user_prompts(self, context: AgentContext) -> List[str]:
+        """Return the user prompts to send concurrently. Defaults to one."""
+        return [self.get_user_prompt(context)]
+    
+    def parse_responses(self, responses: List[str], context: AgentContext) -> AgentContext:
+        """Parse the responses to get_user_prompts(), in the same order."""
+        return self.parse_response(responses[0], context)
+    
+    def _cache_inputs(self, context: AgentContext) -> Optional[Any]:
+        """Return the part of the context this agent's output depends on.
+        
+        Agents whose output is a pure function of these inputs override this
+        (together with output_fields) to have their results cached; None
+        disables caching.
+        """
+        return None
+    
+    def _cache_key(self, context: AgentContext) -> Optional[Tuple[str, str]]:
+        inputs = self._cache_inputs(context)
+        if inputs is None or not self.output_fields:
+            return None
+        digest = hashlib.blake2b(orjson.dumps(inputs, option=orjson.OPT_SORT_KEYS), digest_size=16)
+        return self.name, digest.hexdigest()
+    
+    async def _send(self, prompt: str, semaphore: asyncio.Semaphore, report_progress: bool = False) -> str:
+        """Send one prompt, holding a slot of the run's concurrency limit.
+        
+        The response is streamed so the connection is released as soon as
+        the last token arrives. With report_progress, the parsed response is
+        published as a progress event before the other calls finish.
+        """
+        async with semaphore:
+            chunks = [
+                chunk async for chunk in
+                self.llm.stream_message(UserMessage(text=prompt), response_format=self.output_model)
+            ]
+        response = "".join(chunks)
+        if report_progress:
+            self.emit_progress(response)
+        return response
+    
+    def emit_progress(self, response: str) -> None:
+        """Publish one parsed response to the graph's custom stream.
+        
+        Outside a LangGraph run (e.g. calling run() directly) there is no stream
+        writer and this is a no-op.
+        """
+        try:
+            writer = get_stream_writer()
+        except RuntimeError:
+            return
+        try:
+            data = self.parse_output(response)
+        except ValueError:
+            return
+        writer({"agent": self.name, "data": data})
+    
     async def run(self, context: AgentContext) -> AgentContext:
         """Execute the agent and update context.
         
+        Cacheable agents are single-flight per cache key: concurrent runs
+        over the same inputs wait for the first one and reuse its output
+        instead of each calling the LLM.
+        """
+        logger.info(f"[{self.name}] TASK_STARTED")
+        
+        cache_key = self._cache_key(context)
+        if cache_key is None:
+            return await self._execute(context)
+        
+        lock = _cache_locks.get(cache_key)
+        if lock is None:
+            lock = _cache_locks[cache_key] = asyncio.Lock()
+        async with lock:
+            cached = _output_cache.get(cache_key)
+            if cached is not None:
+                for name, value in orjson.loads(cached).items():
+                    setattr(context, name, value)
+                context.add_trace(Trace(agent=self.name, status="cached", start_ns=time.time_ns()))
+                logger.info(f"[{self.name}] TASK_COMPLETED from cache")
+                return context
+            
+            context = await self._execute(context)
+            _output_cache[cache_key] = orjson.dumps(
+                {name: getattr(context, name) for name in self.output_fields}
+            )
+        return context
+    
+    async def _execute(self, context: AgentContext) -> AgentContext:
+        """Call the LLM and parse its responses into the context.
+        
         This method handles:
         - Logging for observability
         - Error handling
         - Timing metrics
         """
-        start_time = datetime.now(timezone.utc)
-        
-        logger.info(f"[{self.name}] Starting agent execution")
+        start_time = time.time_ns()
+        start_ns = time.perf_counter_ns()
         
         try:
-            user_prompt = self.get_user_prompt(context)
+            user_prompts = self.get_user_prompts(context)
             
-            # Call LLM
-            response = await self.llm.send_message(UserMessage(text=user_prompt))
+            # Call LLM (independent prompts run concurrently)
+            # (with several calls, each result is reported as it lands)
+            report_progress = len(user_prompts) > 1
+            # Per call, so the limit bounds this run's fan-out and a run never
+            # queues (against its node timeout) behind other users' runs
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            responses = await asyncio.gather(
+                *(self._send(p, semaphore, report_progress) for p in user_prompts)
+            )
             
             # Parse and update context
-            context = self.parse_response(response, context)
+            context = self.parse_responses(responses, context)
             
             # Log trace for observability
-            end_time = datetime.now(timezone.utc)
-            trace = {
-                "agent": self.name,
-                "start_time": start_time.isoformat(),
-                "end_time": end_time.isoformat(),
-                "duration_ms": (end_time - start_time).total_seconds() * 1000,
-                "status": "success",
-                "prompt_length": len(user_prompt),
-                "response_length": len(response)
-            }
-            context.agent_traces.append(trace)
+            trace = Trace(
+                agent=self.name,
+                status="success",
+                start_ns=start_time,
+                dur_ns=time.perf_counter_ns() - start_ns,
+                llm_calls=len(user_prompts),
+                prompt_len=sum(map(len, user_prompts)) if TRACE_LEN else None,
+                resp_len=sum(map(len, responses)) if TRACE_LEN else None
+            )
+            context.add_trace(trace)
             
-            logger.info(f"[{self.name}] Completed in {trace['duration_ms']:.2f}ms")
+            logger.info(f"[{self.name}] TASK_COMPLETED in {trace.dur_ns / 1e6:.2f}ms")
             
         except Exception as e:
-            logger.error(f"[{self.name}] Error: {str(e)}")
-            context.agent_traces.append({
-                "agent": self.name,
-                "start_time": start_time.isoformat(),
-                "status": "error",
-                "error": str(e)
-            })
+            logger.error(f"[{self.name}] TASK_FAILED: {str(e)}")
+            context.add_trace(Trace(
+                agent=self.name,
+                status="error",
+                start_ns=start_time,
+                dur_ns=time.perf_counter_ns() - start_ns,
+                err=str(e)
+            ))
             raise
         
         return context
     
+    def parse_output(self, response: str) -> Dict[str, Any]:
+        """Parse a structured-output response into a dict.
+        
+        Falls back to extract_json for fallback providers that ignored the
+        response schema and wrapped their JSON in markdown or prose.
+        """
+        if self.output_model is not None:
+            try:
+                return self.output_model.model_validate_json(response).model_dump()
+            except ValidationError:
+                pass
+        return self.extract_json(response)
+    
     def extract_json(self, text: str) -> Dict[str, Any]:
         """Extract JSON from LLM response, handling markdown code blocks."""
+        # Work on bytes offsets so the JSON body is parsed without copying
+        data = text.encode()
+        start, end = 0, len(data)
+        
         # Try to find JSON in code blocks
-        if "```json" in text:
-            start = text.find("```json") + 7
-            end = text.find("```", start)
-            text = text[start:end].strip()
-        elif "```" in text:
-            start = text.find("```") + 3
-            end = text.find("```", start)
-            text = text[start:end].strip()
+        fence = data.find(_FENCE_JSON)
+        if fence != -1:
+            start = fence + len(_FENCE_JSON)
+            end = data.find(_FENCE, start)
+        else:
+            fence = data.find(_FENCE)
+            if fence != -1:
+                start = fence + len(_FENCE)
+                end = data.find(_FENCE, start)
+        if end == -1:
+            end = len(data)
         
+        view = memoryview(data)
         try:
-            return json.loads(text)
-        except json.JSONDecodeError:
+            return orjson.loads(view[start:end])
+        except orjson.JSONDecodeError:
             # Try to find any JSON object in the text
-            import re
-            json_match = re.search(r'\{[\s\S]*\}', text)
+            json_match = _JSON_RE.search(data, start, end)
             if json_match:
-                return json.loads(json_match.group())
-            raise ValueError(f"Could not parse JSON from response: {text[:200]}")
+                return orjson.loads(view[json_match.start():json_match.end()])
+            raise ValueError(
+                f"Could not parse JSON from response: {data[start:start + 200].decode(errors='replace')}"
+            )
@@ -3,18 +3,33 @@
 This agent evaluates how well the founder fits each candidate niche
 and provides fit scores with detailed justifications.
 """
-import json
+import heapq
+from typing import Any, Dict, List, Optional, Final
+from pydantic import BaseModel, Field
 from .base_agent import BaseAgent, AgentContext
 
 
-class FitEvaluatorAgent(BaseAgent):
-    """Evaluates founder-problem fit for each candidate niche."""
-    
-    name = "fit_evaluator"
-    description = "Evaluates founder-problem fit and ranks niches"
-    
-    def get_system_prompt(self) -> str:
-        return """You are a Founder-Problem Fit Evaluator specializing in startup success prediction.
+# Niches evaluated per LLM call: batching saves resending the system prompt
+# and founder profile per niche, while several batches still run concurrently
+FIT_BATCH_SIZE = 3
+
+
+class NicheEvaluation(BaseModel):
+    """The Fit Evaluator's assessment of one niche."""
+    niche_name: str = Field(description="Name of the niche, exactly as given")
+    fit_score: int = Field(description="1-100")
+    score_justification: str = Field(description="Detailed explanation of why this score")
+    key_strengths_match: List[str] = Field(description="Founder strengths that match")
+    key_gaps: List[str] = Field(description="Gaps or risks")
+    improvement_suggestions: List[str] = Field(description="What would improve fit")
+
+
+class FitEvaluatorOutput(BaseModel):
+    """Structured output of the Fit Evaluator for a batch of niches."""
+    evaluations: List[NicheEvaluation]
+
+
+_SYSTEM_PROMPT: Final[str] = """You are a Founder-Problem Fit Evaluator specializing in startup success prediction.
 
 Your role is to evaluate how well a founder matches each proposed startup niche
 and provide detailed fit assessments with scores.
@@ -28,13 +43,45 @@ You consider:
 - Risk profile match
 
 Be honest and critical - it's better to redirect a founder than let them pursue a poor fit.
+Score consistently: niches are evaluated a few at a time and ranked by score.
+
+## Task:
+For each niche, provide:
+1. A fit score (1-100)
+2. Detailed justification for the score
+3. Key risks or gaps
+4. What would make this a better fit
 
 Always respond with valid JSON in the exact format specified."""
+
+
+class FitEvaluatorAgent(BaseAgent):
+    """Evaluates founder-problem fit for each candidate niche."""
     
-    def get_user_prompt(self, context: AgentContext) -> str:
-        profile = context.profile_summary or {}
+    name = "fit_evaluator"
+    description = "Evaluates founder-problem fit and ranks niches"
+    output_model = FitEvaluatorOutput
+    output_fields = ("candidate_niches", "niche_evaluations", "selected_niches")
+    
+    def get_system_prompt(self) -> str:
+        return _SYSTEM_PROMPT
+    
+    def _cache_inputs(self, context: AgentContext):
+        return context.raw_profile, context.profile_summary, context.candidate_niches
+    
+    def get_user_prompts(self, context: AgentContext) -> List[str]:
+        # One call per batch of niches so the batches run concurrently
         niches = context.candidate_niches
+        return [
+            self.get_user_prompt(context, niches[i:i + FIT_BATCH_SIZE])
+            for i in range(0, len(niches), FIT_BATCH_SIZE)
+        ]
+    
+    def get_user_prompt(self, context: AgentContext, niches: Optional[List[Dict[str, Any]]] = None) -> str:
+        """Prompt evaluating a batch of niches (all candidates if none are given)."""
+        profile = context.profile_summary or {}
         raw = context.raw_profile
+        niches = niches if niches is not None else context.candidate_niches
         
         niches_text = ""
         for i, niche in enumerate(niches, 1):
@@ -55,62 +102,34 @@ Always respond with valid JSON in the exact format specified."""
 - Risk Appetite: {raw.get('risk_appetite', 'medium')}
 - Learning Mode: {raw.get('learning_mode', 'build-first')}
 
-## Candidate Niches:{niches_text}
-
-## Task:
-For each niche, provide:
-1. A fit score (1-100)
-2. Detailed justification for the score
-3. Key risks or gaps
-4. What would make this a better fit
-
-Then select the top 2-3 niches that best fit this founder.
-
-## Output Format (JSON):
-```json
-{{
-  "evaluations": [
-    {{
-      "niche_name": "Name of the niche",
-      "fit_score": 85,
-      "score_justification": "Detailed explanation of why this score",
-      "key_strengths_match": ["strength that matches"],
-      "key_gaps": ["gap or risk"],
-      "improvement_suggestions": ["what would improve fit"]
-    }}
-  ],
-  "top_recommendations": [
-    {{
-      "rank": 1,
-      "niche_name": "Best fit niche",
-      "summary": "Why this is the top recommendation"
-    }}
-  ]
-}}
-```
-
-Respond ONLY with the JSON object, no additional text."""
+## Candidate Niches:{niches_text}"""
     
     def parse_response(self, response: str, context: AgentContext) -> AgentContext:
-        data = self.extract_json(response)
-        context.niche_evaluations = data.get('evaluations', [])
+        """Record the evaluations of one batch of niches."""
+        context.niche_evaluations.extend(self.parse_output(response).get('evaluations', []))
+        return context
+    
+    def parse_responses(self, responses: List[str], context: AgentContext) -> AgentContext:
+        context.niche_evaluations = []
+        for response in responses:
+            context = self.parse_response(response, context)
         
-        # Merge fit scores into candidate niches
+        # Merge each evaluation's score into its niche in one pass
+        evals_by_name = {e.get('niche_name'): e for e in context.niche_evaluations}
         for niche in context.candidate_niches:
-            for eval in context.niche_evaluations:
-                if eval.get('niche_name') == niche.get('name'):
-                    niche['fit_score'] = eval.get('fit_score', 0)
-                    niche['score_justification'] = eval.get('score_justification', '')
-                    niche['key_gaps'] = eval.get('key_gaps', [])
-                    break
+            if (evaluation := evals_by_name.get(niche.get('name'))):
+                niche.update({
+                    'fit_score': evaluation.get('fit_score', 0),
+                    'score_justification': evaluation.get('score_justification', ''),
+                    'key_gaps': evaluation.get('key_gaps', [])
+                })
         
-        # Select top niches
-        top_recs = data.get('top_recommendations', [])
-        context.selected_niches = []
-        for rec in top_recs:
-            for niche in context.candidate_niches:
-                if niche.get('name') == rec.get('niche_name'):
-                    context.selected_niches.append(niche)
-                    break
+        # Select the top niches by score
+        context.selected_niches = rank_niches(context.candidate_niches)
         
         return context
+
+
+def rank_niches(niches: list, limit: int = 3) -> list:
+    """Return the highest-scoring niches, best first."""
+    return heapq.nlargest(limit, niches, key=lambda n: n.get('fit_score') or 0)
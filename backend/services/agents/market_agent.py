@@ -3,18 +3,30 @@
 This agent proposes promising problem spaces/niches where the founder
 could have a competitive edge based on their profile.
 """
-import json
+from typing import List, Final
+from pydantic import BaseModel, Field
 from .base_agent import BaseAgent, AgentContext
 
 
-class MarketHunterAgent(BaseAgent):
-    """Identifies promising problem spaces and niches for the founder."""
-    
-    name = "market_hunter"
-    description = "Discovers promising problem spaces aligned with founder profile"
-    
-    def get_system_prompt(self) -> str:
-        return """You are a Market & Problem Hunter specializing in startup opportunity identification.
+class CandidateNiche(BaseModel):
+    """A niche proposed by the Market Hunter."""
+    name: str
+    description: str = Field(description="What the startup would do")
+    problem_statement: str = Field(description="The specific problem being solved")
+    target_audience: str = Field(description="Who would buy this")
+    why_fits_founder: str = Field(description="Why this founder is well-positioned")
+    market_opportunity: str = Field(description="Size and growth potential")
+    competition_level: str = Field(description="low | medium | high")
+    cofounder_skills_needed: List[str]
+    improvement_areas: List[str]
+
+
+class MarketHunterOutput(BaseModel):
+    """Structured output of the Market Hunter."""
+    niches: List[CandidateNiche]
+
+
+_SYSTEM_PROMPT: Final[str] = """You are a Market & Problem Hunter specializing in startup opportunity identification.
 
 Your role is to identify 3-7 specific problem spaces where a founder could build
 a successful startup based on their unique background and skills.
@@ -27,7 +39,33 @@ You focus on:
 
 Think step-by-step and justify each recommendation.
 
+## Task:
+Propose 4-6 specific problem spaces/niches where this founder could succeed.
+
+For each niche:
+1. Be specific (not "AI startup" but "AI-powered code review for security vulnerabilities")
+2. Explain why their background gives them an edge
+3. Identify the target audience
+4. Assess competition level
+5. Suggest complementary cofounder skills that would increase chances
+6. Identify improvement areas the founder could work on
+
 Always respond with valid JSON in the exact format specified."""
+
+
+class MarketHunterAgent(BaseAgent):
+    """Identifies promising problem spaces and niches for the founder."""
+    
+    name = "market_hunter"
+    description = "Discovers promising problem spaces aligned with founder profile"
+    output_model = MarketHunterOutput
+    output_fields = ("candidate_niches",)
+    
+    def get_system_prompt(self) -> str:
+        return _SYSTEM_PROMPT
+    
+    def _cache_inputs(self, context: AgentContext):
+        return context.raw_profile, context.profile_summary
     
     def get_user_prompt(self, context: AgentContext) -> str:
         profile = context.profile_summary or {}
@@ -47,41 +85,9 @@ Always respond with valid JSON in the exact format specified."""
 - Excited Domains: {', '.join(raw.get('excited_domains', []))}
 - Target Roles: {', '.join(raw.get('target_roles', []))}
 - Risk Appetite: {raw.get('risk_appetite', 'medium')}
-- Time Available: {raw.get('hours_per_week', 0)} hours/week
-
-## Task:
-Propose 4-6 specific problem spaces/niches where this founder could succeed.
-
-For each niche:
-1. Be specific (not "AI startup" but "AI-powered code review for security vulnerabilities")
-2. Explain why their background gives them an edge
-3. Identify the target audience
-4. Assess competition level
-5. Suggest complementary cofounder skills that would increase chances
-6. Identify improvement areas the founder could work on
-
-## Output Format (JSON):
-```json
-{{
-  "niches": [
-    {{
-      "name": "Niche name",
-      "description": "What the startup would do",
-      "problem_statement": "The specific problem being solved",
-      "target_audience": "Who would buy this",
-      "why_fits_founder": "Why this founder is well-positioned",
-      "market_opportunity": "Size and growth potential",
-      "competition_level": "low/medium/high",
-      "cofounder_skills_needed": ["skill1", "skill2"],
-      "improvement_areas": ["area1", "area2"]
-    }}
-  ]
-}}
-```
-
-Respond ONLY with the JSON object, no additional text."""
+- Time Available: {raw.get('hours_per_week', 0)} hours/week"""
     
     def parse_response(self, response: str, context: AgentContext) -> AgentContext:
-        data = self.extract_json(response)
+        data = self.parse_output(response)
         context.candidate_niches = data.get('niches', [])
         return context
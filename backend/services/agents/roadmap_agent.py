@@ -4,18 +4,41 @@ This agent creates a detailed 3-6-12 month roadmap for the founder
 to pursue their selected niche, including skills to acquire, projects
 to build, and strategies for finding first customers.
 """
-import json
+from typing import List, Final
+from pydantic import BaseModel, Field
 from .base_agent import BaseAgent, AgentContext
 
 
-class RoadmapArchitectAgent(BaseAgent):
-    """Creates actionable founder roadmaps with concrete milestones."""
-    
-    name = "roadmap_architect"
-    description = "Creates detailed founder journey roadmaps"
-    
-    def get_system_prompt(self) -> str:
-        return """You are a Roadmap Architect specializing in founder journey planning.
+class PhaseResource(BaseModel):
+    name: str
+    url: str
+    type: str = Field(description="free | paid")
+
+
+class PhasePlan(BaseModel):
+    phase_name: str = Field(description='e.g. "0-3 months: Foundation & Validation"')
+    goals: List[str]
+    actions: List[str] = Field(description='e.g. "Action (X hours/week)"')
+    resources: List[PhaseResource]
+    milestones: List[str]
+    deliverables: List[str]
+
+
+class SuggestedRole(BaseModel):
+    role: str = Field(description="Job title")
+    company_type: str = Field(description="Type of company to target")
+    why: str = Field(description="Why this role helps the founder journey")
+    duration: str = Field(description="Recommended time in role")
+
+
+class RoadmapArchitectOutput(BaseModel):
+    """Structured output of the Roadmap Architect."""
+    phases: List[PhasePlan]
+    suggested_roles: List[SuggestedRole]
+    first_customer_strategies: List[str] = Field(description='e.g. "Strategy: Description"')
+
+
+_SYSTEM_PROMPT: Final[str] = """You are a Roadmap Architect specializing in founder journey planning.
 
 Your role is to create actionable, time-bound roadmaps that help founders:
 - Acquire necessary skills (using FREE or LOW-COST resources)
@@ -30,7 +53,39 @@ You focus on:
 - Progressive skill building
 - Early validation strategies
 
+## Task:
+Create a phased roadmap broken into:
+1. Phase 1 (0-3 months): Foundation & Validation
+2. Phase 2 (3-6 months): Building & Learning
+3. Phase 3 (6-12 months): Launch & Scale
+
+For each phase include:
+- Clear goals
+- Specific actions (with time estimates)
+- FREE or LOW-COST resources (include URLs where possible)
+- Milestones to track progress
+- Deliverables
+
+Also suggest:
+- Roles/jobs that would align with their niche journey
+- Strategies for finding first customers
+
 Always respond with valid JSON in the exact format specified."""
+
+
+class RoadmapArchitectAgent(BaseAgent):
+    """Creates actionable founder roadmaps with concrete milestones."""
+    
+    name = "roadmap_architect"
+    description = "Creates detailed founder journey roadmaps"
+    output_model = RoadmapArchitectOutput
+    output_fields = ("roadmap",)
+    
+    def get_system_prompt(self) -> str:
+        return _SYSTEM_PROMPT
+    
+    def _cache_inputs(self, context: AgentContext):
+        return context.raw_profile, context.profile_summary, context.selected_niches[:2] or context.candidate_niches[:2]
     
     def get_user_prompt(self, context: AgentContext) -> str:
         profile = context.profile_summary or {}
@@ -54,61 +109,9 @@ Always respond with valid JSON in the exact format specified."""
 - Learning Mode: {raw.get('learning_mode', 'build-first')}
 - Network Strength: {raw.get('network_strength', 'moderate')}
 
-## Selected Niches:{niche_text}
-
-## Task:
-Create a phased roadmap broken into:
-1. Phase 1 (0-3 months): Foundation & Validation
-2. Phase 2 (3-6 months): Building & Learning
-3. Phase 3 (6-12 months): Launch & Scale
-
-For each phase include:
-- Clear goals
-- Specific actions (with time estimates)
-- FREE or LOW-COST resources (include URLs where possible)
-- Milestones to track progress
-- Deliverables
-
-Also suggest:
-- Roles/jobs that would align with their niche journey
-- Strategies for finding first customers
-
-## Output Format (JSON):
-```json
-{{
-  "phases": [
-    {{
-      "phase_name": "0-3 months: Foundation & Validation",
-      "goals": ["goal1", "goal2"],
-      "actions": [
-        "Action 1 (X hours/week)",
-        "Action 2 (X hours/week)"
-      ],
-      "resources": [
-        {{"name": "Resource name", "url": "https://...", "type": "free"}}
-      ],
-      "milestones": ["milestone1", "milestone2"],
-      "deliverables": ["deliverable1", "deliverable2"]
-    }}
-  ],
-  "suggested_roles": [
-    {{
-      "role": "Job title",
-      "company_type": "Type of company to target",
-      "why": "Why this role helps the founder journey",
-      "duration": "Recommended time in role"
-    }}
-  ],
-  "first_customer_strategies": [
-    "Strategy 1: Description",
-    "Strategy 2: Description"
-  ]
-}}
-```
-
-Respond ONLY with the JSON object, no additional text."""
+## Selected Niches:{niche_text}"""
     
     def parse_response(self, response: str, context: AgentContext) -> AgentContext:
-        data = self.extract_json(response)
+        data = self.parse_output(response)
         context.roadmap = data
         return context
@@ -0,0 +1,17 @@
+"""orjson (de)serializers for Arq job payloads.
+
+Arq pickles job arguments and results by default. Everything the API
+enqueues is plain JSON (ids plus the flattened profile dict), so orjson
+encodes it faster and smaller in Redis. Anything orjson can't encode
+natively, such as an exception stored as a failed job's result, falls back
+to its string form.
+"""
+import orjson
+
+
+def serialize_job(obj) -> bytes:
+    return orjson.dumps(obj, default=str)
+
+
+def deserialize_job(data: bytes):
+    return orjson.loads(data)
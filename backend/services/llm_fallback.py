@@ -1,20 +1,95 @@
+import asyncio
 import logging
-from typing import List
-from litellm import acompletion  # async completion
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, Type
+import httpx
+from pydantic import BaseModel
 
 logger = logging.getLogger(__name__)
 
+# Providers whose litellm integration honours cache_control on message
+# content blocks inline. Gemini/Vertex are left out: litellm turns it into an
+# explicit cachedContent resource, which they reject below a minimum prompt
+# size far larger than the agents' system prompts (and which costs an extra
+# round trip per call); they cache repeated prefixes implicitly anyway.
+PROMPT_CACHE_PROVIDERS = ("anthropic/",)
+
+# Hedged requests: the next model is started once the running ones have
+# been slower than this EWMA of the primary's observed latency
+HEDGE_DEFAULT_DELAY = 4.0
+HEDGE_EWMA_ALPHA = 0.2
+
+# Circuit breaker: skip a model for a while after consecutive failures
+BREAKER_FAILURES = 3
+BREAKER_COOLDOWN = 30.0
+
+
+# One pooled HTTP/2 client shared by every litellm call, so fallbacks and
+# concurrent agents reuse warm connections instead of new TLS handshakes
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def _acompletion():
+    """Return litellm's async completion, importing litellm on first use.
+
+    litellm eagerly imports its provider SDKs, which costs hundreds of
+    milliseconds, so it is kept off the import path of the app. The shared
+    HTTP client is installed at the same time.
+    """
+    global _http_client
+    import litellm
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            timeout=60.0,
+            limits=httpx.Limits(max_keepalive_connections=50, max_connections=200)
+        )
+        litellm.aclient_session = _http_client
+    return litellm.acompletion
+
+
+async def close_http_client() -> None:
+    """Close the shared LLM HTTP client (on shutdown)."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+def warmup() -> None:
+    """Import litellm ahead of the first LLM call."""
+    _acompletion()
+
 class LlmChat:
     """
     Unified LLM client with automatic fallback:
     Gemini → Groq → OpenAI → OpenRouter (optional)
+
+    Rather than waiting out a slow model before trying the next one, the
+    next model in the chain is raced against it after a hedge delay.
     """
 
+    # Per-model EWMA latency in seconds, shared by every client
+    _latency: Dict[str, float] = {}
+    # Per-model (consecutive failures, skip until monotonic time)
+    _MODEL_STATE: Dict[str, Tuple[int, float]] = {}
+
     def __init__(self, api_key: str, session_id: str, system_message: str):
         self.api_key = api_key
         self.session_id = session_id
         self.system_message = system_message
 
+        # The system message never changes, so build both shapes once
+        self._system_msg = {"role": "system", "content": system_message}
+        self._cached_system_msg = {
+            "role": "system",
+            "content": [{
+                "type": "text",
+                "text": system_message,
+                "cache_control": {"type": "ephemeral"}
+            }]
+        }
+
         # default model chain (highest → lowest)
         self.fallback_chain = [
             "gemini/gemini-2.0-flash",
@@ -34,30 +109,130 @@ class LlmChat:
         self.fallback_chain[0] = self.current_model
         return self
 
-    async def send_message(self, user_message: 'UserMessage') -> str:
-        """Try each LLM provider until one responds without failing."""
-        messages = [
-            {"role": "system", "content": self.system_message},
-            {"role": "user", "content": user_message.text}
-        ]
+    def build_messages(self, model: str, text: str) -> list:
+        """Build the chat messages, marking the static system prompt as
+        cacheable for providers that support prompt caching."""
+        if model.startswith(PROMPT_CACHE_PROVIDERS):
+            return [self._cached_system_msg, {"role": "user", "content": text}]
+        return [self._system_msg, {"role": "user", "content": text}]
+
+    def hedge_delay(self, model: str) -> float:
+        """How long to wait on a model before racing the next one."""
+        return self._latency.get(model, HEDGE_DEFAULT_DELAY)
+
+    def record_latency(self, model: str, seconds: float) -> None:
+        previous = self._latency.get(model)
+        if previous is None:
+            self._latency[model] = seconds
+        else:
+            self._latency[model] = previous + HEDGE_EWMA_ALPHA * (seconds - previous)
+
+    def is_available(self, model: str) -> bool:
+        """False while the model's circuit breaker is open."""
+        _, skip_until = self._MODEL_STATE.get(model, (0, 0.0))
+        return time.monotonic() >= skip_until
+
+    def record_success(self, model: str) -> None:
+        self._MODEL_STATE.pop(model, None)
 
+    def record_failure(self, model: str) -> None:
+        failures = self._MODEL_STATE.get(model, (0, 0.0))[0] + 1
+        skip_until = 0.0
+        if failures >= BREAKER_FAILURES:
+            skip_until = time.monotonic() + BREAKER_COOLDOWN
+            logger.warning(f"[LlmChat] Skipping model for {BREAKER_COOLDOWN:.0f}s after {failures} failures: {model}")
+        self._MODEL_STATE[model] = (failures, skip_until)
+
+    async def _hedged(self, attempt: Callable[[str], Awaitable[Any]]) -> Any:
+        """Run attempt(model) down the fallback chain as a hedged race.
+
+        The next model starts as soon as an attempt fails or the newest one
+        has outlived its hedge delay. The first attempt to succeed
+        wins and the rest are cancelled. Models whose circuit breaker is
+        open are skipped; if every breaker is open, the model closest to
+        the end of its cooldown is tried anyway as a half-open probe, so a
+        brief outage can't fail every call for the whole cooldown.
+        """
+        pending: Dict[asyncio.Task, tuple] = {}
+        available = [m for m in self.fallback_chain if self.is_available(m)]
+        if not available:
+            probe = min(self.fallback_chain, key=lambda m: self._MODEL_STATE.get(m, (0, 0.0))[1])
+            logger.warning(f"[LlmChat] All circuit breakers open, probing: {probe}")
+            available = [probe]
+        models = iter(available)
         last_error = None
 
-        for model in self.fallback_chain:
-            try:
+        def launch() -> Optional[str]:
+            model = next(models, None)
+            if model is not None:
                 logger.info(f"[LlmChat] Trying model: {model}")
+                pending[asyncio.ensure_future(attempt(model))] = (model, time.perf_counter())
+            return model
 
-                resp = await acompletion(
-                    model=model,
-                    messages=messages
+        newest = launch()
+        try:
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=self.hedge_delay(newest) if newest else None,
+                    return_when=asyncio.FIRST_COMPLETED
                 )
+                if not done:
+                    # Still waiting: hedge with the next model
+                    newest = launch()
+                    continue
 
-                return resp["choices"][0]["message"]["content"]
+                for task in done:
+                    model, started = pending.pop(task)
+                    if task.exception() is None:
+                        self.record_latency(model, time.perf_counter() - started)
+                        self.record_success(model)
+                        return task.result()
+                    logger.error(f"[LlmChat] Model failed: {model} → {task.exception()}")
+                    self.record_failure(model)
+                    last_error = task.exception()
 
-            except Exception as e:
-                logger.error(f"[LlmChat] Model failed: {model} → {e}")
-                last_error = e
-                continue
+                # A failure frees its slot for the next model straight away
+                newest = launch()
+        finally:
+            for task in pending:
+                task.cancel()
 
         # If all models fail:
         raise RuntimeError(f"All fallback models failed. Last error: {last_error}")
+
+    async def stream_message(
+        self, user_message: 'UserMessage', response_format: Optional[Type[BaseModel]] = None
+    ) -> AsyncIterator[str]:
+        """Stream the response text as it is generated.
+
+        Models are hedged up to their first chunk; the first model to start
+        producing text is streamed to the end. A failure after that point is
+        raised, since the caller has already consumed part of the answer.
+
+        If response_format is given, providers that support structured output
+        are asked for JSON matching that model's schema; the rest ignore it
+        (drop_params) and answer from the prompt's format instructions.
+        """
+        async def attempt(model: str):
+            stream = await _acompletion()(
+                model=model,
+                messages=self.build_messages(model, user_message.text),
+                response_format=response_format,
+                drop_params=True,
+                stream=True
+            )
+            chunks = stream.__aiter__()
+            async for chunk in chunks:
+                text = chunk.choices[0].delta.content
+                if text:
+                    return text, chunks
+            return "", chunks
+
+        first, chunks = await self._hedged(attempt)
+        if first:
+            yield first
+        async for chunk in chunks:
+            text = chunk.choices[0].delta.content
+            if text:
+                yield text
@@ -1,21 +1,33 @@
 """Agent Orchestrator using LangGraph for state management and observability.
 
 This module orchestrates the flow of agents in the niche discovery pipeline.
-It uses a simple sequential flow but is designed to be easily extended to
-more complex workflows (parallel execution, conditional branching, etc.).
+Dependent agents run in sequence; independent agents at the end of the
+pipeline fork into parallel graph branches, running concurrently since the
+work is dominated by LLM round-trips.
 
 Observability: The orchestrator logs the entire pipeline execution with
 timing metrics for each agent, making it easy to integrate with Datadog,
 LangSmith, or other observability tools.
 """
+import asyncio
+import copy
+import functools
 import logging
-from typing import Dict, Any, TypedDict
-from datetime import datetime, timezone
+import queue
+import random
+import time
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+import operator
+from typing import Annotated, Dict, Any, AsyncIterator, List, Optional, Tuple, TypedDict
 
 from langgraph.graph import StateGraph, END
 
+from config import LOG_SAMPLE_DEBUG, LOG_SAMPLE_INFO
+from services.llm_fallback import close_http_client
 from services.agents import (
     AgentContext,
+    BaseAgent,
     ProfileAnalystAgent,
     MarketHunterAgent,
     FitEvaluatorAgent,
@@ -23,18 +35,119 @@ from services.agents import (
     ToolingAdvisorAgent
 )
 from models.report import (
-    NicheReport, ProfileSummary, Niche, Roadmap, RoadmapPhase, ToolRecommendation
+    NicheReport, ProfileSummary, Niche, Roadmap, RoadmapPhase, ToolRecommendation,
+    PipelineEvent, PartialReport
 )
 
 logger = logging.getLogger(__name__)
 
 
+class _RootHandlers(logging.Handler):
+    """Hand records to the root logger's handlers (in the listener thread)."""
+    
+    def emit(self, record: logging.LogRecord) -> None:
+        # Like Logger.callHandlers, fall back to lastResort rather than drop
+        handlers = logging.getLogger().handlers or [logging.lastResort]
+        for handler in handlers:
+            if handler and record.levelno >= handler.level:
+                handler.handle(record)
+
+
+# ID of the pipeline run being executed (the report ID). Set once per run
+# and inherited by every task the graph spawns, so agent logs carry it
+# without threading it through the state.
+correlation_id_var: ContextVar[str] = ContextVar("correlation_id")
+
+
+class CorrelationIdFilter(logging.Filter):
+    """Tag each record with the current run's correlation ID."""
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.correlation_id = correlation_id_var.get("-")
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a fraction of DEBUG/INFO records and every WARNING and above."""
+    
+    def __init__(self, rates: Dict[int, float]):
+        super().__init__()
+        self.rates = rates
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(record.levelno, 1.0)
+        return rate >= 1.0 or random.random() < rate
+
+
+# Writer thread for queued pipeline log records; None until started
+_log_listener: Optional[QueueListener] = None
+_queue_handler: Optional[QueueHandler] = None
+
+
+def start_pipeline_logging() -> None:
+    """Queue pipeline (services.*) log records for a background writer thread.
+    
+    Handler I/O then never blocks the event loop. Call once the root
+    logger's handlers are configured (server lifespan, worker startup);
+    calling it again is a no-op.
+    """
+    global _log_listener, _queue_handler
+    if _log_listener is not None:
+        return
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _queue_handler = QueueHandler(log_queue)
+    _queue_handler.addFilter(SamplingFilter({logging.DEBUG: LOG_SAMPLE_DEBUG, logging.INFO: LOG_SAMPLE_INFO}))
+    _queue_handler.addFilter(CorrelationIdFilter())
+    _queue_handler.setFormatter(logging.Formatter("[%(correlation_id)s] %(message)s"))
+    services_logger = logging.getLogger("services")
+    services_logger.addHandler(_queue_handler)
+    services_logger.propagate = False
+    _log_listener = QueueListener(log_queue, _RootHandlers())
+    _log_listener.start()
+
+
+def stop_pipeline_logging() -> None:
+    """Flush queued records and give services.* logs back to the root logger."""
+    global _log_listener, _queue_handler
+    if _log_listener is None:
+        return
+    services_logger = logging.getLogger("services")
+    services_logger.removeHandler(_queue_handler)
+    services_logger.propagate = True
+    _log_listener.stop()
+    _log_listener = _queue_handler = None
+
+
+# Node retries: the LLM layer already falls back across providers, so these
+# cover hung calls and malformed model output (ValueError from parsing)
+NODE_ATTEMPTS = 2
+RETRY_BACKOFF = 1.0
+TRANSIENT_ERRORS = (RuntimeError, ValueError)
+
+
+def _merge_status(current: str, update: str) -> str:
+    """An error from any branch sticks."""
+    return "error" if "error" in (current, update) else update
+
+
+def _merge_error(current: str, update: str) -> str:
+    return update or current
+
+
 class OrchestratorState(TypedDict):
-    """State object for LangGraph orchestration."""
-    context: Dict[str, Any]
-    current_agent: str
-    status: str
-    error: str
+    """State object for LangGraph orchestration.
+    
+    The inputs never change after the run starts. Each node writes only its
+    own output slice, merged into outputs by the reducer, so nodes in
+    parallel branches never write the same key.
+    """
+    inputs: Dict[str, Any]
+    outputs: Annotated[Dict[str, Any], operator.or_]
+    traces: Annotated[list, operator.add]
+    status: Annotated[str, _merge_status]
+    error: Annotated[str, _merge_error]
 
 
 class NicheDiscoveryOrchestrator:
@@ -44,8 +157,8 @@ class NicheDiscoveryOrchestrator:
     1. Profile Analyst -> Summarizes user profile
     2. Market Hunter -> Identifies candidate niches
     3. Fit Evaluator -> Scores founder-niche fit
-    4. Roadmap Architect -> Creates action roadmap
-    5. Tooling Advisor -> Recommends tools
+    4. Roadmap Architect -> Creates action roadmap     } run concurrently
+       Tooling Advisor -> Recommends tools             }
     
     The orchestrator:
     - Manages agent execution order
@@ -55,10 +168,48 @@ class NicheDiscoveryOrchestrator:
     
     To add a new agent:
     1. Create the agent class in services/agents/
-    2. Add it to the pipeline in _build_graph()
-    3. Update the node handlers
+    2. Create it in __init__ and add it to NODES and NEXT_NODES
+    3. List the context fields it produces in NODE_OUTPUTS
     """
     
+    # Graph nodes and the agent each one runs
+    NODES = {
+        "profile_analyst": "profile_agent",
+        "market_hunter": "market_agent",
+        "fit_evaluator": "fit_agent",
+        "roadmap_architect": "roadmap_agent",
+        "tooling_advisor": "tooling_agent",
+    }
+    
+    # Node the run starts from
+    ENTRY_NODE = "profile_analyst"
+    
+    # Nodes that start once a node has finished (fan-out when several);
+    # nodes not listed here end the run
+    NEXT_NODES = {
+        "profile_analyst": ("market_hunter",),
+        "market_hunter": ("fit_evaluator",),
+        "fit_evaluator": ("roadmap_architect", "tooling_advisor"),
+    }
+    
+    # Per-attempt time limit for each node, in seconds
+    NODE_TIMEOUTS = {
+        "profile_analyst": 60,
+        "market_hunter": 90,
+        "fit_evaluator": 90,
+        "roadmap_architect": 120,
+        "tooling_advisor": 90,
+    }
+    
+    # Context fields each graph node produces (its output slice)
+    NODE_OUTPUTS = {
+        "profile_analyst": ("profile_summary",),
+        "market_hunter": ("candidate_niches",),
+        "fit_evaluator": ("candidate_niches", "niche_evaluations", "selected_niches"),
+        "roadmap_architect": ("roadmap",),
+        "tooling_advisor": ("tool_recommendations",),
+    }
+    
     def __init__(self):
         self.profile_agent = ProfileAnalystAgent()
         self.market_agent = MarketHunterAgent()
@@ -69,205 +220,291 @@ class NicheDiscoveryOrchestrator:
         # Build the LangGraph workflow
         self.graph = self._build_graph()
     
+    async def aclose(self) -> None:
+        """Release the pooled HTTP client every agent's LLM calls share."""
+        await close_http_client()
+    
+    @classmethod
+    def max_run_seconds(cls, node: Optional[str] = None) -> float:
+        """Worst-case duration of a run (from node on), in seconds.
+        
+        Every attempt of every node on the slowest path times out, with
+        the retry backoff in between. Job timeouts must exceed this or the
+        run is killed before its node retries can finish.
+        """
+        node = node or cls.ENTRY_NODE
+        backoff = sum(RETRY_BACKOFF * 2 ** i for i in range(NODE_ATTEMPTS - 1))
+        own = NODE_ATTEMPTS * cls.NODE_TIMEOUTS[node] + backoff
+        return own + max((cls.max_run_seconds(n) for n in cls.NEXT_NODES.get(node, ())), default=0)
+    
     def _build_graph(self) -> StateGraph:
         """Build the LangGraph state machine.
         
         The graph defines the execution order and flow control.
-        Currently uses a simple linear flow, but can be extended
-        for parallel execution or conditional branching.
+        Agents that depend on each other run in sequence; the roadmap
+        and tooling agents only need the fit evaluation, so they fork
+        from it as parallel branches and the run ends when both finish.
         """
         # Define the graph with our state type
         workflow = StateGraph(OrchestratorState)
         
-        # Add nodes for each agent
-        workflow.add_node("profile_analyst", self._run_profile_agent)
-        workflow.add_node("market_hunter", self._run_market_agent)
-        workflow.add_node("fit_evaluator", self._run_fit_agent)
-        workflow.add_node("roadmap_architect", self._run_roadmap_agent)
-        workflow.add_node("tooling_advisor", self._run_tooling_agent)
+        for name, agent_attr in self.NODES.items():
+            workflow.add_node(name, self._make_node(name, getattr(self, agent_attr)))
+        workflow.set_entry_point(self.ENTRY_NODE)
         
-        # Define edges (linear flow)
-        workflow.set_entry_point("profile_analyst")
-        workflow.add_edge("profile_analyst", "market_hunter")
-        workflow.add_edge("market_hunter", "fit_evaluator")
-        workflow.add_edge("fit_evaluator", "roadmap_architect")
-        workflow.add_edge("roadmap_architect", "tooling_advisor")
-        workflow.add_edge("tooling_advisor", END)
+        # Stop at the first failed step rather than running the rest on its gaps
+        for name in self.NODES:
+            next_nodes = self.NEXT_NODES.get(name)
+            if next_nodes:
+                workflow.add_conditional_edges(name, self._route_to(next_nodes), [*next_nodes, END])
+            else:
+                workflow.add_edge(name, END)
         
         return workflow.compile()
     
-    async def _run_profile_agent(self, state: OrchestratorState) -> OrchestratorState:
-        """Execute profile analyst agent."""
-        try:
-            context = AgentContext(**state["context"])
-            context = await self.profile_agent.run(context)
-            state["context"] = context.model_dump()
-            state["current_agent"] = "profile_analyst"
-            state["status"] = "completed"
-        except Exception as e:
-            state["status"] = "error"
-            state["error"] = str(e)
-            logger.error(f"Profile agent error: {e}")
-        return state
+    @staticmethod
+    def _route_to(next_nodes: Tuple[str, ...]):
+        """Edge condition: continue to next_nodes unless the step failed."""
+        def route(state: OrchestratorState):
+            return END if state["status"] == "error" else list(next_nodes)
+        return route
     
-    async def _run_market_agent(self, state: OrchestratorState) -> OrchestratorState:
-        """Execute market hunter agent."""
-        try:
-            context = AgentContext(**state["context"])
-            context = await self.market_agent.run(context)
-            state["context"] = context.model_dump()
-            state["current_agent"] = "market_hunter"
-            state["status"] = "completed"
-        except Exception as e:
-            state["status"] = "error"
-            state["error"] = str(e)
-            logger.error(f"Market agent error: {e}")
-        return state
-    
-    async def _run_fit_agent(self, state: OrchestratorState) -> OrchestratorState:
-        """Execute fit evaluator agent."""
-        try:
-            context = AgentContext(**state["context"])
-            context = await self.fit_agent.run(context)
-            state["context"] = context.model_dump()
-            state["current_agent"] = "fit_evaluator"
-            state["status"] = "completed"
-        except Exception as e:
-            state["status"] = "error"
-            state["error"] = str(e)
-            logger.error(f"Fit agent error: {e}")
-        return state
+    @staticmethod
+    def _snapshot(inputs: Dict[str, Any], outputs: Dict[str, Any]) -> AgentContext:
+        """A fresh context holding copies of the run inputs and the outputs so far.
+        
+        Agents update the lists and dicts they're given in place, so the
+        copies keep a node (or a failed attempt) from mutating the outputs
+        in the graph state that other nodes read.
+        """
+        return AgentContext(raw_profile=copy.deepcopy(inputs["raw_profile"]), **copy.deepcopy(outputs))
     
-    async def _run_roadmap_agent(self, state: OrchestratorState) -> OrchestratorState:
-        """Execute roadmap architect agent."""
-        try:
-            context = AgentContext(**state["context"])
-            context = await self.roadmap_agent.run(context)
-            state["context"] = context.model_dump()
-            state["current_agent"] = "roadmap_architect"
-            state["status"] = "completed"
-        except Exception as e:
-            state["status"] = "error"
-            state["error"] = str(e)
-            logger.error(f"Roadmap agent error: {e}")
-        return state
+    @staticmethod
+    def _view(inputs: Dict[str, Any], outputs: Dict[str, Any]) -> AgentContext:
+        """A context over the run inputs and outputs without copying them,
+        for the report builders, which only read it."""
+        return AgentContext(raw_profile=inputs["raw_profile"], **outputs)
     
-    async def _run_tooling_agent(self, state: OrchestratorState) -> OrchestratorState:
-        """Execute tooling advisor agent."""
-        try:
-            context = AgentContext(**state["context"])
-            context = await self.tooling_agent.run(context)
-            state["context"] = context.model_dump()
-            state["current_agent"] = "tooling_advisor"
-            state["status"] = "completed"
-        except Exception as e:
-            state["status"] = "error"
-            state["error"] = str(e)
-            logger.error(f"Tooling agent error: {e}")
-        return state
+    def _make_node(self, name: str, agent: BaseAgent):
+        """Build the graph node that runs an agent on a context snapshot.
+        
+        Each attempt works on its own snapshot and the node returns only
+        the fields it produced, so neither parallel branches nor retries
+        share a mutable context. Each attempt is bounded by the node's timeout, and timeouts
+        or transient failures are retried with exponential backoff.
+        """
+        timeout = self.NODE_TIMEOUTS[name]
+        output_fields = self.NODE_OUTPUTS[name]
+        
+        async def node(state: OrchestratorState) -> Dict[str, Any]:
+            traces = []
+            try:
+                for attempt in range(1, NODE_ATTEMPTS + 1):
+                    context = self._snapshot(state["inputs"], state["outputs"])
+                    try:
+                        context = await asyncio.wait_for(agent.run(context), timeout)
+                        break
+                    except TimeoutError:
+                        error = TimeoutError(f"timed out after {timeout:.0f}s")
+                    except TRANSIENT_ERRORS as e:
+                        error = e
+                    finally:
+                        # Keep the traces of failed attempts too
+                        traces.extend(context.agent_traces)
+                    if attempt == NODE_ATTEMPTS:
+                        raise error
+                    logger.warning("%s attempt %d failed, retrying: %s", name, attempt, error)
+                    await asyncio.sleep(RETRY_BACKOFF * 2 ** (attempt - 1))
+            except Exception as e:
+                # The one error handler for every node; the traceback is free here
+                logger.exception("%s error", name)
+                return {"status": "error", "error": str(e), "traces": traces}
+            return {
+                "outputs": {field: getattr(context, field) for field in output_fields},
+                "traces": traces,
+                "status": "completed"
+            }
+        
+        return node
     
-    async def run(self, profile_data: Dict[str, Any], user_id: str, profile_id: str) -> NicheReport:
+    async def run(self, profile_data: Dict[str, Any], user_id: str, profile_id: str, report_id: str) -> NicheReport:
         """Run the complete niche discovery pipeline.
         
         Args:
             profile_data: Raw founder profile data
             user_id: ID of the user
             profile_id: ID of the saved profile
+            report_id: ID of the pending report this run fills in
         
         Returns:
             NicheReport: Complete analysis report
         """
-        start_time = datetime.now(timezone.utc)
-        logger.info(f"Starting niche discovery pipeline for user {user_id}")
+        report = None
+        async for event in self.run_streaming(profile_data, user_id, profile_id, report_id):
+            if event.event == "report_completed":
+                report = event.report
+        return report
+    
+    async def run_streaming(
+        self, profile_data: Dict[str, Any], user_id: str, profile_id: str, report_id: str
+    ) -> AsyncIterator[PipelineEvent]:
+        """Run the pipeline, yielding an event as each graph node finishes.
+        
+        Yields "agent_progress" events as agents with several LLM calls
+        finish each one, one "agent_completed" (or "agent_failed") event per
+        node with that node's outputs and the report built so far, then a
+        final "report_completed" event carrying the full report.
+        """
+        start_time = time.perf_counter()
+        correlation_id_var.set(report_id)
+        logger.info("Starting niche discovery pipeline for user %s", user_id)
         
         # Initialize state
-        initial_state: OrchestratorState = {
-            "context": AgentContext(raw_profile=profile_data).model_dump(),
-            "current_agent": "",
+        inputs = {"raw_profile": profile_data}
+        state: OrchestratorState = {
+            "inputs": inputs,
+            "outputs": {},
+            "traces": [],
             "status": "pending",
             "error": ""
         }
         
-        # Run the graph
-        final_state = await self.graph.ainvoke(initial_state)
+        # Run the graph, surfacing each node's outputs as soon as it finishes
+        # and any partial results the agents publish while they run. Node
+        # updates are merged the same way the graph's reducers merge them.
+        outputs: Dict[str, Any] = {}
+        traces: list = []
+        error = ""
+        async for mode, update in self.graph.astream(state, stream_mode=["updates", "custom"]):
+            if mode == "custom":
+                yield PipelineEvent(event="agent_progress", agent=update["agent"], data=update["data"])
+                continue
+            for node, node_update in update.items():
+                traces += node_update["traces"]
+                if node_update["status"] == "error":
+                    error = error or node_update["error"]
+                    yield PipelineEvent(event="agent_failed", agent=node, data={"error": node_update["error"]})
+                else:
+                    outputs |= node_update["outputs"]
+                    yield PipelineEvent(
+                        event="agent_completed",
+                        agent=node,
+                        data=node_update["outputs"],
+                        partial=self._build_partial_report(self._view(inputs, outputs), report_id)
+                    )
+        
+        if error:
+            raise RuntimeError(error)
         
         # Extract results
-        context = AgentContext(**final_state["context"])
+        context = self._view(inputs, outputs)
+        context.agent_traces.extend(traces)
         
-        end_time = datetime.now(timezone.utc)
-        duration = (end_time - start_time).total_seconds()
-        logger.info(f"Pipeline completed in {duration:.2f}s")
+        duration = time.perf_counter() - start_time
+        logger.info("Pipeline completed in %.2fs", duration)
         
         # Build the report
-        report = self._build_report(context, user_id, profile_id)
+        report = self._build_report(context, user_id, profile_id, report_id)
         
-        return report
+        yield PipelineEvent(event="report_completed", report=report)
     
-    def _build_report(self, context: AgentContext, user_id: str, profile_id: str) -> NicheReport:
-        """Convert agent context into a structured report."""
-        # Build profile summary
-        profile_summary = ProfileSummary(
-            background_summary=context.profile_summary.get('background_summary', '') if context.profile_summary else '',
-            key_strengths=context.profile_summary.get('key_strengths', []) if context.profile_summary else [],
-            notable_skills=context.profile_summary.get('notable_skills', []) if context.profile_summary else [],
-            constraints_summary=context.profile_summary.get('constraints_summary', '') if context.profile_summary else '',
-            ideal_founder_archetype=context.profile_summary.get('ideal_founder_archetype', '') if context.profile_summary else ''
+    def _build_profile_summary(self, context: AgentContext) -> ProfileSummary:
+        g = (context.profile_summary or {}).get
+        return ProfileSummary(
+            background_summary=g('background_summary', ''),
+            key_strengths=g('key_strengths', []),
+            notable_skills=g('notable_skills', []),
+            constraints_summary=g('constraints_summary', ''),
+            ideal_founder_archetype=g('ideal_founder_archetype', '')
         )
+    
+    def _build_niches(self, context: AgentContext) -> List[Niche]:
+        chosen = context.selected_niches or context.candidate_niches[:3]
+        _Niche = Niche
+        # "for g in (n.get,)" binds each item's .get once inside the comprehension
+        return [
+            _Niche(
+                name=g('name', ''),
+                description=g('description', ''),
+                problem_statement=g('problem_statement', ''),
+                target_audience=g('target_audience', ''),
+                why_fits_you=g('why_fits_founder', ''),
+                market_opportunity=g('market_opportunity', ''),
+                competition_level=g('competition_level', 'medium'),
+                fit_score=g('fit_score', 50),
+                improvement_areas=g('improvement_areas', []),
+                cofounder_skills_needed=g('cofounder_skills_needed', [])
+            )
+            for n in chosen for g in (n.get,)
+        ]
+    
+    def _build_roadmap(self, context: AgentContext) -> Roadmap:
+        roadmap_get = (context.roadmap or {}).get
+        _Phase = RoadmapPhase
+        phases = [
+            _Phase(
+                phase_name=g('phase_name', ''),
+                goals=g('goals', []),
+                actions=g('actions', []),
+                resources=g('resources', []),
+                milestones=g('milestones', []),
+                deliverables=g('deliverables', [])
+            )
+            for p in roadmap_get('phases', []) for g in (p.get,)
+        ]
         
-        # Build niches
-        niches = []
-        for n in context.selected_niches or context.candidate_niches[:3]:
-            niches.append(Niche(
-                name=n.get('name', ''),
-                description=n.get('description', ''),
-                problem_statement=n.get('problem_statement', ''),
-                target_audience=n.get('target_audience', ''),
-                why_fits_you=n.get('why_fits_founder', ''),
-                market_opportunity=n.get('market_opportunity', ''),
-                competition_level=n.get('competition_level', 'medium'),
-                fit_score=n.get('fit_score', 50),
-                improvement_areas=n.get('improvement_areas', []),
-                cofounder_skills_needed=n.get('cofounder_skills_needed', [])
-            ))
-        
-        # Build roadmap
-        roadmap_data = context.roadmap or {}
-        phases = []
-        for p in roadmap_data.get('phases', []):
-            phases.append(RoadmapPhase(
-                phase_name=p.get('phase_name', ''),
-                goals=p.get('goals', []),
-                actions=p.get('actions', []),
-                resources=p.get('resources', []),
-                milestones=p.get('milestones', []),
-                deliverables=p.get('deliverables', [])
-            ))
-        
-        roadmap = Roadmap(
+        return Roadmap(
             phases=phases,
-            suggested_roles=roadmap_data.get('suggested_roles', []),
-            first_customer_strategies=roadmap_data.get('first_customer_strategies', [])
+            suggested_roles=roadmap_get('suggested_roles', []),
+            first_customer_strategies=roadmap_get('first_customer_strategies', [])
         )
-        
-        # Build tool recommendations
-        tools = []
-        for t in context.tool_recommendations:
-            tools.append(ToolRecommendation(
-                name=t.get('name', ''),
-                category=t.get('category', ''),
-                description=t.get('description', ''),
-                pricing=t.get('pricing', 'free'),
-                url=t.get('url'),
-                why_recommended=t.get('why_recommended', '')
-            ))
+    
+    def _build_tools(self, context: AgentContext) -> List[ToolRecommendation]:
+        _Tool = ToolRecommendation
+        return [
+            _Tool(
+                name=g('name', ''),
+                category=g('category', ''),
+                description=g('description', ''),
+                pricing=g('pricing', 'free'),
+                url=g('url'),
+                why_recommended=g('why_recommended', '')
+            )
+            for t in context.tool_recommendations for g in (t.get,)
+        ]
+    
+    def _build_partial_report(self, context: AgentContext, report_id: str) -> PartialReport:
+        """Convert whatever the agents have produced so far into a report."""
+        return PartialReport(
+            id=report_id,
+            profile_summary=self._build_profile_summary(context) if context.profile_summary else None,
+            recommended_niches=self._build_niches(context),
+            roadmap=self._build_roadmap(context) if context.roadmap else None,
+            tool_recommendations=self._build_tools(context)
+        )
+    
+    def _build_report(self, context: AgentContext, user_id: str, profile_id: str, report_id: str) -> NicheReport:
+        """Convert agent context into a structured report."""
+        niches = self._build_niches(context)
         
         return NicheReport(
+            id=report_id,
             user_id=user_id,
             profile_id=profile_id,
-            profile_summary=profile_summary,
+            profile_summary=self._build_profile_summary(context),
             recommended_niches=niches,
             selected_niche=niches[0] if niches else None,
-            roadmap=roadmap,
-            tool_recommendations=tools,
+            roadmap=self._build_roadmap(context),
+            tool_recommendations=self._build_tools(context),
             status="completed"
         )
+
+
+@functools.lru_cache(maxsize=None)
+def get_orchestrator() -> NicheDiscoveryOrchestrator:
+    """Return the process-wide orchestrator.
+    
+    The agents hold no per-run state, so one instance (and one compiled
+    graph) serves every run in the process.
+    """
+    return NicheDiscoveryOrchestrator()
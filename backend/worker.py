@@ -0,0 +1,113 @@
+"""Arq worker for running the niche discovery pipeline out of the HTTP request.
+
+The API enqueues a job per analysis and returns immediately with a pending
+report. This worker picks the job up, runs the agent pipeline and writes the
+finished report over the pending stub.
+
+Run with:
+    arq worker.WorkerSettings
+"""
+import asyncio
+import logging
+from pathlib import Path
+
+from arq import Retry
+from arq.connections import RedisSettings
+from dotenv import load_dotenv
+from pydantic import TypeAdapter
+import uvloop
+
+# Load environment variables first
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+from config import REDIS_URL
+from db.database import db, close_database
+from services.orchestrator import (
+    NicheDiscoveryOrchestrator, get_orchestrator, start_pipeline_logging, stop_pipeline_logging
+)
+from services.llm_fallback import warmup as warmup_llm
+from services.job_serializer import serialize_job, deserialize_job
+from models.report import NicheReport
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# The worker only drives the I/O-bound pipeline; run it on uvloop like the
+# API server. Arq creates its loop after importing this module.
+asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+MAX_TRIES = 3
+# Headroom over the pipeline's worst case for loading and saving the report
+JOB_TIMEOUT_MARGIN = 60
+
+_report_adapter = TypeAdapter(NicheReport)
+
+
+async def run_analysis_task(ctx, report_id: str, profile_data: dict, user_id: str, profile_id: str):
+    """Run the agent pipeline and store the result on the pending report."""
+    orchestrator: NicheDiscoveryOrchestrator = ctx["orchestrator"]
+    job_try = ctx.get("job_try", 1)
+
+    await db.reports.update_one({"id": report_id}, {"$set": {"status": "processing"}})
+
+    try:
+        logger.info(f"Starting analysis for user {user_id}, report {report_id} (try {job_try})")
+        report = await orchestrator.run(profile_data, user_id, profile_id, report_id)
+    except asyncio.CancelledError:
+        # job_timeout or worker shutdown; Arq won't retry a timeout, so don't
+        # leave the report "processing" forever (a re-run resets the status)
+        logger.error(f"Analysis cancelled for report {report_id}")
+        await db.reports.update_one(
+            {"id": report_id},
+            {"$set": {"status": "failed", "error": "Analysis was cancelled"}}
+        )
+        raise
+    except Exception as e:
+        if job_try < MAX_TRIES:
+            logger.warning(f"Analysis failed for report {report_id}, retrying: {str(e)}")
+            raise Retry(defer=job_try * 5)
+
+        logger.error(f"Analysis failed for report {report_id}: {str(e)}")
+        await db.reports.update_one(
+            {"id": report_id},
+            {"$set": {"status": "failed", "error": str(e)}}
+        )
+        return
+
+    # Keep the created_at of the pending stub so list ordering is stable
+    report_doc = _report_adapter.dump_python(report)
+    report_doc.pop("created_at")
+
+    await db.reports.update_one({"id": report_id}, {"$set": report_doc})
+
+    logger.info(f"Analysis completed for user {user_id}, report {report_id}")
+
+
+async def startup(ctx):
+    start_pipeline_logging()
+    # Pay for the litellm import before the first job rather than during it
+    warmup_llm()
+    ctx["orchestrator"] = get_orchestrator()
+
+
+async def shutdown(ctx):
+    await ctx["orchestrator"].aclose()
+    await close_database()
+    stop_pipeline_logging()
+
+
+class WorkerSettings:
+    """Arq worker configuration."""
+    functions = [run_analysis_task]
+    on_startup = startup
+    on_shutdown = shutdown
+    redis_settings = RedisSettings.from_dsn(REDIS_URL)
+    max_tries = MAX_TRIES
+    # Must match the serializer the API's pool enqueues with
+    job_serializer = staticmethod(serialize_job)
+    job_deserializer = staticmethod(deserialize_job)
+    job_timeout = int(NicheDiscoveryOrchestrator.max_run_seconds()) + JOB_TIMEOUT_MARGIN
@@ -1,7 +1,7 @@
 import { useState } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { useAuth } from '@/context/AuthContext';
-import { profileApi, analysisApi } from '@/services/api';
+import { profileApi, analysisApi, reportsApi } from '@/services/api';
 import { toast } from 'sonner';
 import { Button } from '@/components/ui/button';
 import { Card, CardContent, CardHeader, CardTitle, CardDescription } from '@/components/ui/card';
@@ -54,6 +54,10 @@ const TARGET_ROLES = [
   'Full-stack Developer', 'Startup Employee'
 ];
 
+// Report status polling; the deadline outlasts the worker's job timeout
+const POLL_INTERVAL_MS = 2000;
+const MAX_POLLS = 450; // 15 minutes
+
 const Onboarding = () => {
   const navigate = useNavigate();
   const { user } = useAuth();
@@ -137,13 +141,30 @@ const Onboarding = () => {
       // Run analysis
       setIsAnalyzing(true);
       const analysisResponse = await analysisApi.runAnalysis(profileResponse.data.id);
+      const reportId = analysisResponse.data.report_id;
+      
+      // Poll until the worker finishes the report, giving up after MAX_POLLS
+      let status = analysisResponse.data.status;
+      let polls = 0;
+      while (status === 'pending' || status === 'processing') {
+        if (++polls > MAX_POLLS) {
+          throw new Error('Analysis is taking longer than expected. Check your dashboard later.');
+        }
+        await new Promise(resolve => setTimeout(resolve, POLL_INTERVAL_MS));
+        const statusResponse = await reportsApi.getReportStatus(reportId);
+        status = statusResponse.data.status;
+      }
+      
+      if (status === 'failed') {
+        throw new Error('Analysis failed');
+      }
       
       toast.success('Analysis complete!');
-      navigate(`/results/${analysisResponse.data.report_id}`);
+      navigate(`/results/${reportId}`);
       
     } catch (error) {
       console.error('Error:', error);
-      toast.error(error.response?.data?.detail || 'Something went wrong');
+      toast.error(error.response?.data?.detail || error.message || 'Something went wrong');
     } finally {
       setIsSubmitting(false);
       setIsAnalyzing(false);
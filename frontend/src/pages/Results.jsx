@@ -25,6 +25,12 @@ const Results = () => {
     const fetchReport = async () => {
       try {
         const response = await reportsApi.getReport(reportId);
+        // Queued, running or failed analyses have nothing to render yet
+        if (response.data.status && response.data.status !== 'completed') {
+          toast.error(response.data.status === 'failed' ? 'This analysis failed' : 'This report is still being generated');
+          navigate('/dashboard');
+          return;
+        }
         setReport(response.data);
         setCompletedMilestones(response.data.milestones_completed || []);
       } catch (error) {
@@ -46,7 +52,8 @@ const Results = () => {
     setCompletedMilestones(newMilestones);
     
     try {
-      await reportsApi.updateMilestones(reportId, newMilestones);
+      const response = await reportsApi.updateMilestones(reportId, newMilestones);
+      setCompletedMilestones(response.data.milestones_completed);
     } catch (error) {
       toast.error('Failed to update milestone');
     }
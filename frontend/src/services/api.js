@@ -56,6 +56,8 @@ export const analysisApi = {
 export const reportsApi = {
   listReports: () => api.get('/reports'),
   getReport: (id) => api.get(`/reports/${id}`),
+  getReportStatus: (id) => api.get(`/reports/${id}/status`),
   deleteReport: (id) => api.delete(`/reports/${id}`),
+  getMilestones: (id) => api.get(`/reports/${id}/milestones`),
   updateMilestones: (id, milestones) => api.patch(`/reports/${id}/milestones`, { milestones_completed: milestones }),
 };